@@ -6,11 +6,18 @@ Includes: system prompt, context, user messages, AI responses, tool calls and re
 """
 
 import os
-import json
+import orjson
 from datetime import datetime
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 
+# Pretty-printed, UTF-8 as-is (like ensure_ascii=False); non-str keys allowed
+_JSON_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+
+
+def _to_json(obj: Any) -> str:
+    return orjson.dumps(obj, option=_JSON_OPTIONS, default=str).decode()
+
 # Log directory
 LOG_DIR = Path(__file__).parent / "logs" / "agent_conversations"
 
@@ -96,7 +103,7 @@ class AgentConversationLogger:
         self.entries.append("-" * 40)
         self.entries.append(f"TOOL CALL: {tool_name}")
         self.entries.append("-" * 40)
-        self.entries.append(f"Input: {json.dumps(tool_input, ensure_ascii=False, indent=2)}")
+        self.entries.append(f"Input: {_to_json(tool_input)}")
         self.entries.append("")
 
     def log_tool_result(self, tool_name: str, result: Any):
@@ -112,7 +119,7 @@ class AgentConversationLogger:
             else:
                 self.entries.append(result)
         else:
-            result_str = json.dumps(result, ensure_ascii=False, indent=2)
+            result_str = _to_json(result)
             if len(result_str) > 5000:
                 self.entries.append(result_str[:5000] + f"\n... [truncated]")
             else:
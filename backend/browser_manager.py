@@ -50,7 +50,11 @@ class BrowserManager:
         self._browser_channel = browser
 
         print(f"[BrowserManager] Usando browser_data en: {self.user_data_dir}")
-        self.playwright = await async_playwright().start()
+        # Reuse the Playwright driver across browser restarts - when the user
+        # closes the window only the browser process needs relaunching
+        reused_driver = self.playwright is not None
+        if not reused_driver:
+            self.playwright = await async_playwright().start()
 
         # Base args for all modes
         browser_args = [
@@ -79,9 +83,32 @@ class BrowserManager:
         # For chromium (Docker), don't specify channel
         channel = None if browser == "chromium" else browser
 
+        try:
+            self.context = await self._launch_context(headless, channel, browser_args)
+        except Exception as e:
+            if not reused_driver:
+                raise
+            # The kept driver went down too - start a fresh one and retry once
+            print(f"[BrowserManager] Playwright driver unusable ({e}), restarting it...")
+            try:
+                await self.playwright.stop()
+            except Exception:
+                pass
+            self.playwright = await async_playwright().start()
+            self.context = await self._launch_context(headless, channel, browser_args)
+        # Close any restored tabs and start fresh
+        if len(self.context.pages) > 1:
+            print(f"[BrowserManager] Closing {len(self.context.pages) - 1} restored tab(s)...")
+            for page in self.context.pages[1:]:
+                await page.close()
+        self.page = self.context.pages[0] if self.context.pages else await self.context.new_page()
+        self._started = True
+
+    async def _launch_context(self, headless: bool, channel: Optional[str], browser_args: List[str]) -> BrowserContext:
+        """Launch the persistent browser context on the current Playwright driver."""
         # Use no_viewport=True to allow manual window resizing (more natural browser behavior)
         # This is useful when you want to manually interact with the browser
-        self.context = await self.playwright.chromium.launch_persistent_context(
+        return await self.playwright.chromium.launch_persistent_context(
             user_data_dir=self.user_data_dir,
             headless=headless,
             channel=channel,  # None for bundled chromium, "msedge"/"chrome" for installed browsers
@@ -90,13 +117,6 @@ class BrowserManager:
             args=browser_args,
             ignore_default_args=["--enable-automation"],  # Less intrusive automation
         )
-        # Close any restored tabs and start fresh
-        if len(self.context.pages) > 1:
-            print(f"[BrowserManager] Closing {len(self.context.pages) - 1} restored tab(s)...")
-            for page in self.context.pages[1:]:
-                await page.close()
-        self.page = self.context.pages[0] if self.context.pages else await self.context.new_page()
-        self._started = True
 
     async def stop(self):
         """Close the browser."""
@@ -134,15 +154,9 @@ class BrowserManager:
 
         print("[BrowserManager] Browser was closed, restarting...")
 
-        # Clean up any stale references
+        # Clean up any stale references (the Playwright driver is kept and reused)
         self.context = None
         self.page = None
-        if self.playwright:
-            try:
-                await self.playwright.stop()
-            except Exception:
-                pass
-            self.playwright = None
 
         # Restart the browser with the same parameters
         await self.start(headless=self._headless, browser=self._browser_channel)
@@ -198,16 +212,10 @@ class BrowserManager:
             error_str = str(e).lower()
             if "closed" in error_str or "target" in error_str or "context" in error_str:
                 print(f"[BrowserManager] Browser context is dead ({e}), performing full restart...")
-                # Force cleanup
+                # Force cleanup (the Playwright driver is kept and reused)
                 self.context = None
                 self.page = None
                 self._started = False
-                if self.playwright:
-                    try:
-                        await self.playwright.stop()
-                    except Exception:
-                        pass
-                    self.playwright = None
                 # Restart browser
                 await self.start(headless=self._headless, browser=self._browser_channel)
                 await self.page.goto("https://laboratoriofranz.orion-labs.com/ordenes", timeout=30000)
@@ -274,6 +282,11 @@ class BrowserManager:
         dismissed = False
 
         try:
+            # Usually nothing is open - one combined probe covers all three
+            # types below, instead of three sequential count() round-trips
+            if await self.page.locator("#notificacion-modal.show, .modal.show").count() == 0:
+                return False
+
             # Type 1: Check if the custom notification modal is visible
             modal = self.page.locator("#notificacion-modal.show")
             if await modal.count() > 0:
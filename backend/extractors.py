@@ -3,8 +3,10 @@ Page Data Extractors - Extract structured data from each page type.
 Each function returns a structured dict ready for AI context.
 Improved based on actual HTML structure analysis.
 """
-from typing import Optional
-from playwright.async_api import Page
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:  # Only needed for annotations - the JS constants don't need playwright
+    from playwright.async_api import Page
 
 
 # JavaScript para extraer lista de órdenes (mejorado)
@@ -26,13 +28,16 @@ EXTRACT_ORDENES_JS = r"""
 
     if (!ordersTable) return ordenes;
 
-    const rows = ordersTable.querySelectorAll('tbody tr');
+    // Live row collection - no snapshot of the whole tbody, and the loop
+    // stops after the 20 rows we keep
+    const rows = ordersTable.tBodies[0]?.rows || [];
 
-    rows.forEach((row, index) => {
-        if (index >= 20) return;
+    for (let index = 0; index < rows.length && index < 20; index++) {
+        const row = rows[index];
 
-        const cells = row.querySelectorAll('td');
-        if (cells.length < 5) return;
+        // row.cells is the row's own cell list - no selector match per row
+        const cells = row.cells;
+        if (cells.length < 5) continue;
 
         // Extract ID from data-registro (in cell 3)
         let id = null;
@@ -98,7 +103,7 @@ EXTRACT_ORDENES_JS = r"""
             valor: valor,
             id: id
         });
-    });
+    }
 
     return ordenes;
 }
@@ -407,7 +412,7 @@ EXTRACT_ADDED_EXAMS_JS = r"""
 class PageDataExtractor:
     """Extractor de datos estructurados de cada tipo de página."""
 
-    def __init__(self, page: Page):
+    def __init__(self, page: "Page"):
         self.page = page
 
     async def detect_page_type(self) -> str:
@@ -30,6 +30,7 @@ class LabAssistantState(TypedDict):
         current_page_type: Type of page ("ordenes_list", "reportes", etc.)
         active_tabs: Dict of open browser tabs {orden_num: tab_info}
         execution_results: Results from tool executions in current turn
+        orders_context_sent: Whether valid orders context was already sent in this thread
     """
     # Core conversation (REDUCER: appends new messages)
     messages: Annotated[List[BaseMessage], add_messages]
@@ -43,3 +44,6 @@ class LabAssistantState(TypedDict):
 
     # Tool execution tracking for current turn
     execution_results: Optional[List[Dict[str, Any]]]
+
+    # Per-thread flag: valid orders context already included (checkpointed by thread_id)
+    orders_context_sent: Optional[bool]
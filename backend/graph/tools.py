@@ -133,57 +133,69 @@ HIGHLIGHT_STYLES = """
     }
 """
 
-# JavaScript for filling a field and auto-highlighting
-FILL_FIELD_JS = r"""
-(params) => {
-    const rows = document.querySelectorAll('tr.parametro');
-    for (const row of rows) {
-        const labelCell = row.querySelector('td:first-child');
-        const labelText = labelCell?.innerText?.trim();
-        if (!labelText || !labelText.toLowerCase().includes(params.f.toLowerCase())) {
-            continue;
-        }
+# JavaScript for filling fields and auto-highlighting
+# Takes every field for one results tab and fills them in a single evaluate call
+FILL_FIELDS_JS = r"""
+(fields) => {
+    // Read each row's label and controls once; fields then match against
+    // this index instead of re-querying every row's DOM per field
+    const entries = [];
+    for (const row of document.querySelectorAll('tr.parametro')) {
+        const labelText = row.querySelector('td:first-child')?.innerText?.trim();
         const input = row.querySelector('input');
         const select = row.querySelector('select');
-        const control = input || select;
-        if (!control) continue;
-
-        const prev = input ? input.value : (select.options[select.selectedIndex]?.text || '');
-
-        if (input) {
-            input.value = params.v;
-            input.dispatchEvent(new Event('input', {bubbles: true}));
-            input.dispatchEvent(new Event('change', {bubbles: true}));
-        } else if (select) {
-            let found = false;
-            for (const opt of select.options) {
-                if (opt.text.toLowerCase().includes(params.v.toLowerCase())) {
-                    select.value = opt.value;
-                    select.dispatchEvent(new Event('change', {bubbles: true}));
-                    found = true;
-                    break;
+        if (!labelText || !(input || select)) continue;
+        entries.push({row, labelText, label: labelText.toLowerCase(), input, select});
+    }
+
+    let lastControl = null;
+    const fillField = (params) => {
+        const wanted = params.f.toLowerCase();
+        for (const {row, labelText, label, input, select} of entries) {
+            if (!label.includes(wanted)) continue;
+            const control = input || select;
+
+            const prev = input ? input.value : (select.options[select.selectedIndex]?.text || '');
+
+            if (input) {
+                input.value = params.v;
+                input.dispatchEvent(new Event('input', {bubbles: true}));
+                input.dispatchEvent(new Event('change', {bubbles: true}));
+            } else if (select) {
+                let found = false;
+                for (const opt of select.options) {
+                    if (opt.text.toLowerCase().includes(params.v.toLowerCase())) {
+                        select.value = opt.value;
+                        select.dispatchEvent(new Event('change', {bubbles: true}));
+                        found = true;
+                        break;
+                    }
+                }
+                if (!found) {
+                    return {err: 'Option not found: ' + params.v + ' in field ' + params.f};
                 }
             }
-            if (!found) {
-                return {err: 'Option not found: ' + params.v + ' in field ' + params.f};
-            }
-        }
 
-        control.classList.add('ai-modified');
-        row.classList.add('ai-modified-row');
+            control.classList.add('ai-modified');
+            row.classList.add('ai-modified-row');
 
-        const existingBadge = control.parentNode.querySelector('.ai-change-badge');
-        if (!existingBadge) {
-            const indicator = document.createElement('span');
-            indicator.className = 'ai-change-badge';
-            indicator.textContent = prev + ' → ' + params.v;
-            control.parentNode.appendChild(indicator);
-        }
+            const existingBadge = control.parentNode.querySelector('.ai-change-badge');
+            if (!existingBadge) {
+                const indicator = document.createElement('span');
+                indicator.className = 'ai-change-badge';
+                indicator.textContent = prev + ' → ' + params.v;
+                control.parentNode.appendChild(indicator);
+            }
 
-        control.scrollIntoView({behavior: 'smooth', block: 'center'});
-        return {field: labelText, prev: prev, new: params.v};
-    }
-    return {err: 'Field not found: ' + params.f};
+            lastControl = control;
+            return {field: labelText, prev: prev, new: params.v};
+        }
+        return {err: 'Field not found: ' + params.f};
+    };
+    const results = fields.map(fillField);
+    // One scroll to the last edited field, not a smooth animation per field
+    lastControl?.scrollIntoView({block: 'center'});
+    return results;
 }
 """
 
@@ -200,16 +212,12 @@ def get_active_tabs() -> Dict[str, Any]:
 
 
 async def _inject_highlight_styles(page):
-    """Inject CSS for highlighting modified fields."""
-    await page.evaluate(f"""
-        () => {{
-            if (document.getElementById('ai-styles')) return;
-            const style = document.createElement('style');
-            style.id = 'ai-styles';
-            style.textContent = `{HIGHLIGHT_STYLES}`;
-            document.head.appendChild(style);
-        }}
-    """)
+    """Inject CSS for highlighting modified fields.
+
+    Called once per freshly loaded results tab, so no existence check is
+    needed (a duplicate sheet would only repeat the same rules).
+    """
+    await page.add_style_tag(content=HIGHLIGHT_STYLES)
 
 
 def close_all_tabs():
@@ -274,13 +282,13 @@ async def _find_or_create_results_tab(order_num: str) -> Any:
     await _browser.ensure_browser()  # Auto-restart if browser was closed
     page = await _browser.context.new_page()
     url = f"https://laboratoriofranz.orion-labs.com/reportes2?numeroOrden={order_num}"
-    await page.goto(url, timeout=30000)
+    await page.goto(url, wait_until='domcontentloaded', timeout=30000)
 
-    # Wait for network to settle (AJAX data loading)
+    # Wait for the AJAX-rendered result rows rather than network idle
     try:
-        await page.wait_for_load_state('networkidle', timeout=10000)
+        await page.wait_for_selector('tr.parametro', timeout=10000)
     except Exception:
-        # Fallback to brief wait if networkidle times out
+        # Fallback to brief wait if the rows never appear
         await page.wait_for_timeout(1000)
 
     await _inject_highlight_styles(page)
@@ -587,10 +595,11 @@ async def _search_orders_impl(
 
     try:
         await temp_page.goto(url, timeout=30000)
+        # Wait for the result rows themselves rather than network idle
         try:
-            await temp_page.wait_for_load_state('networkidle', timeout=10000)
+            await temp_page.wait_for_selector('table tbody tr', timeout=5000)
         except Exception:
-            await temp_page.wait_for_timeout(1000)
+            await temp_page.wait_for_timeout(500)
 
         ordenes = await temp_page.evaluate(EXTRACT_ORDENES_JS)
         logger.info(f"[search_orders] Found {len(ordenes)} orders")
@@ -698,34 +707,38 @@ async def _edit_results_impl(data: List[Dict[str, str]]) -> dict:
                 "received": item
             }
 
-    results = []
-    results_by_order = {}
+    # Group fields by order so each tab gets one evaluate round-trip
+    # (indices keep the results in request order)
+    items_by_order: Dict[str, List[int]] = {}
+    for i, item in enumerate(data):
+        items_by_order.setdefault(item["orden"], []).append(i)
 
-    for item in data:
-        order_num = item["orden"]
+    results: List[dict] = [None] * len(data)
+    results_by_order = {}
 
+    for order_num, indices in items_by_order.items():
         # Find or create the tab
         try:
             page = await _find_or_create_results_tab(order_num)
             await page.bring_to_front()
 
-            result = await page.evaluate(FILL_FIELD_JS, {
-                "e": item["e"],
-                "f": item["f"],
-                "v": item["v"]
-            })
-            result["orden"] = order_num
-            results.append(result)
-            logger.info(f"[edit_results] {order_num}/{item['f']}: {result}")
+            order_results = await page.evaluate(FILL_FIELDS_JS, [
+                {"e": data[i]["e"], "f": data[i]["f"], "v": data[i]["v"]}
+                for i in indices
+            ])
+            for i, result in zip(indices, order_results):
+                result["orden"] = order_num
+                results[i] = result
+                logger.info(f"[edit_results] {order_num}/{data[i]['f']}: {result}")
         except Exception as e:
-            results.append({"orden": order_num, "err": str(e)})
+            for i in indices:
+                results[i] = {"orden": order_num, "err": str(e)}
 
-        if order_num not in results_by_order:
-            results_by_order[order_num] = {"filled": 0, "errors": 0}
-        if "field" in results[-1]:
-            results_by_order[order_num]["filled"] += 1
-        if "err" in results[-1]:
-            results_by_order[order_num]["errors"] += 1
+        order_results = [results[i] for i in indices]
+        results_by_order[order_num] = {
+            "filled": sum(1 for r in order_results if "field" in r),
+            "errors": sum(1 for r in order_results if "err" in r)
+        }
 
     filled = len([r for r in results if "field" in r])
     errors = [r for r in results if "err" in r]
@@ -973,7 +986,7 @@ async def _create_order_impl(cedula: str, exams: List[str]) -> dict:
     if not is_cotizacion:
         cedula_input = page.locator('#identificacion')
         await cedula_input.fill(cedula)
-        await page.keyboard.press("Enter")
+        await cedula_input.press("Enter")
         await page.wait_for_timeout(1500)
 
         # Check if "Crear paciente" popup appeared (new patient)
@@ -1024,7 +1037,11 @@ async def _get_available_exams_impl(order_id: Optional[int] = None) -> dict:
     else:
         page = await _browser.ensure_page()
         await page.goto("https://laboratoriofranz.orion-labs.com/ordenes/create", timeout=30000)
-        await page.wait_for_timeout(1500)
+        # Wait for the exam list to render instead of a fixed delay
+        try:
+            await page.wait_for_selector('button[id^="examen-"]', timeout=5000)
+        except Exception:
+            await page.wait_for_timeout(500)
 
     available = await page.evaluate(EXTRACT_AVAILABLE_EXAMS_JS)
     added = await page.evaluate(EXTRACT_ADDED_EXAMS_JS) if order_id else []
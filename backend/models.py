@@ -19,6 +19,7 @@ import json
 from datetime import datetime, date
 from pathlib import Path
 from typing import Optional, List, Any, Dict, Set
+import orjson
 from langchain_core.language_models import BaseChatModel
 from langchain_core.messages import BaseMessage
 from langchain_core.outputs import ChatResult
@@ -100,8 +101,7 @@ def _save_rate_limits(data: Dict):
     """Save rate limit data to file."""
     RATE_LIMIT_FILE.parent.mkdir(exist_ok=True)
     try:
-        with open(RATE_LIMIT_FILE, 'w') as f:
-            json.dump(data, f)
+        RATE_LIMIT_FILE.write_bytes(orjson.dumps(data))
     except Exception as e:
         logger.warning(f"[Model] Could not save rate limits: {e}")
 
@@ -125,8 +125,8 @@ def _save_usage_stats(data: Dict):
     """Save usage stats to file."""
     USAGE_FILE.parent.mkdir(exist_ok=True)
     try:
-        with open(USAGE_FILE, 'w') as f:
-            json.dump(data, f, indent=2)
+        # Written after every model response - one orjson encode + single write
+        USAGE_FILE.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
     except Exception as e:
         logger.warning(f"[Model] Could not save usage stats: {e}")
 
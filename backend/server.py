@@ -20,12 +20,17 @@ import asyncio
 import base64
 import uuid
 import json
+import secrets
+import time
 import logging
 import re
 import csv
+import io
+import itertools
+import reprlib
 from datetime import datetime
-from typing import Optional, List
-from contextlib import asynccontextmanager
+from typing import Optional, List, AsyncIterator, Union
+from contextlib import asynccontextmanager, aclosing
 from pathlib import Path
 
 # Configure logging - use INFO level to reduce noise
@@ -50,6 +55,7 @@ logging.getLogger("urllib3").setLevel(logging.WARNING)
 if sys.platform == "win32":
     asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
 
+import orjson
 from fastapi import FastAPI, UploadFile, File, Form, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse
@@ -186,7 +192,6 @@ browser: Optional[BrowserManager] = None
 graphs: dict = {}  # Dictionary of graphs, keyed by model name
 checkpointer = None
 initial_orders_context: str = ""  # Store initial orders for context
-orders_context_sent: bool = False  # Track if we've sent valid orders context
 orders_context_timestamp: float = 0  # When orders were last fetched
 ORDERS_FRESHNESS_SECONDS = 120  # Orders are fresh for 2 minutes
 
@@ -225,27 +230,26 @@ async def get_orders_context(force_refresh: bool = False) -> str:
         force_refresh: If True, re-fetch orders even if already cached.
                        Use this for new chats to get fresh data.
     """
-    global browser, initial_orders_context, orders_context_sent, orders_context_timestamp
+    global browser, initial_orders_context, orders_context_timestamp
 
     if not is_logged_in():
         logger.info("[Context] User not logged in - browser is on login page")
         return "⚠️ SESIÓN NO INICIADA: El navegador está en la página de login. Por favor, inicia sesión en el navegador para que pueda acceder a las órdenes del laboratorio."
 
     # Check if orders are stale (older than ORDERS_FRESHNESS_SECONDS)
-    import time
     current_time = time.time()
     is_stale = (current_time - orders_context_timestamp) > ORDERS_FRESHNESS_SECONDS
 
-    # Force refresh for new chats, stale data, or if we haven't sent valid orders yet
-    if force_refresh or is_stale or not orders_context_sent or not initial_orders_context:
-        if is_stale and orders_context_sent:
+    # Force refresh for new chats, stale data, or if we don't have valid orders yet
+    has_orders = has_valid_orders_context()
+    if force_refresh or is_stale or not has_orders:
+        if is_stale and has_orders:
             logger.info(f"[Context] Orders are stale ({int(current_time - orders_context_timestamp)}s old), refreshing...")
         else:
             logger.info("[Context] Extracting orders context...")
         initial_orders_context = await extract_initial_context()
         orders_context_timestamp = current_time
-        if initial_orders_context and "Órdenes Recientes" in initial_orders_context:
-            orders_context_sent = True
+        if has_valid_orders_context():
             # Count orders: 7 pipes per row, subtract 2 for header/separator
             order_count = max(0, (initial_orders_context.count('|') // 7) - 2)
             logger.info(f"[Context] Extracted {order_count} orders")
@@ -253,21 +257,136 @@ async def get_orders_context(force_refresh: bool = False) -> str:
     return initial_orders_context
 
 
+def has_valid_orders_context() -> bool:
+    """Check if the cached orders context holds an actual orders table."""
+    return bool(initial_orders_context and "Órdenes Recientes" in initial_orders_context)
+
+
+async def get_thread_orders_sent(graph, config: dict) -> bool:
+    """
+    Check if valid orders context was already sent in this thread.
+
+    The flag lives in the checkpointed graph state (keyed by thread_id),
+    so concurrent conversations don't interfere with each other.
+    """
+    try:
+        state = await graph.aget_state(config)
+    except ValueError:
+        # Graph compiled without a checkpointer: nothing was persisted
+        return False
+    except Exception as e:
+        logger.warning(f"[Context] Could not read thread state, resending orders: {e}")
+        return False
+    return bool(state and state.values.get("orders_context_sent"))
+
+
 def get_orders_freshness() -> dict:
     """Get current orders context freshness status."""
-    import time
     current_time = time.time()
     age_seconds = current_time - orders_context_timestamp if orders_context_timestamp else 0
     is_fresh = age_seconds < ORDERS_FRESHNESS_SECONDS
 
     return {
-        "has_orders": bool(initial_orders_context and "Órdenes Recientes" in initial_orders_context),
+        "has_orders": has_valid_orders_context(),
         "age_seconds": int(age_seconds),
         "is_fresh": is_fresh,
         "freshness_threshold": ORDERS_FRESHNESS_SECONDS
     }
 
 
+# Frames produced within this window are flushed to the client as one write
+STREAM_COALESCE_SECONDS = 0.002
+# Upper bounds on a batch: oldest buffered frame's age, and total size (~one MTU)
+STREAM_COALESCE_MAX_DELAY = 0.015
+STREAM_COALESCE_MAX_BYTES = 1400
+
+# Bounded repr for tool output previews - stops walking large objects early
+# instead of materializing their full str() just to keep 500 chars
+_tool_output_repr = reprlib.Repr()
+_tool_output_repr.maxstring = 500
+_tool_output_repr.maxother = 500
+_tool_output_repr.maxlist = _tool_output_repr.maxtuple = _tool_output_repr.maxdict = 20
+
+
+def preview_tool_output(output, limit: int = 500) -> str:
+    """Short display form of a tool output (strings are sliced, not quoted)."""
+    if isinstance(output, str):
+        return output[:limit]
+    return _tool_output_repr.repr(output)[:limit]
+
+
+async def coalesce_stream(frames: AsyncIterator[Union[str, bytes]],
+                          window: float = STREAM_COALESCE_SECONDS,
+                          max_delay: float = STREAM_COALESCE_MAX_DELAY,
+                          max_bytes: int = STREAM_COALESCE_MAX_BYTES) -> AsyncIterator[bytes]:
+    """
+    Merge bursts of SSE frames into fewer, larger writes.
+
+    Model streams can emit many tiny token events within microseconds of
+    each other. Frames are buffered while the next one arrives within
+    `window` seconds, and flushed together once the source pauses, the
+    oldest buffered frame is `max_delay` seconds old, or the batch reaches
+    `max_bytes` - so a steady stream still goes out as it is produced.
+    The pending read is never cancelled on timeout (that would break the
+    source generator); it is only cancelled when the client goes away.
+    If the source raises, buffered frames are flushed before re-raising.
+    """
+    loop = asyncio.get_running_loop()
+    source = frames.__aiter__()
+    buffer: List[bytes] = []
+    buffered_bytes = 0
+    batch_started = 0.0
+    pending: Optional[asyncio.Future] = None
+    try:
+        while True:
+            if pending is None:
+                pending = asyncio.ensure_future(source.__anext__())
+            if buffer:
+                remaining = batch_started + max_delay - loop.time()
+                done = ()
+                if remaining > 0:
+                    done, _ = await asyncio.wait({pending}, timeout=min(window, remaining))
+                if not done:
+                    yield b"".join(buffer)
+                    buffer.clear()
+                    buffered_bytes = 0
+                    continue
+            try:
+                frame = await pending
+            except StopAsyncIteration:
+                pending = None
+                break
+            except Exception:
+                pending = None
+                if buffer:
+                    yield b"".join(buffer)
+                    buffer.clear()
+                raise
+            pending = None
+            if isinstance(frame, str):
+                frame = frame.encode()
+            if not buffer:
+                batch_started = loop.time()
+            buffer.append(frame)
+            buffered_bytes += len(frame)
+            if buffered_bytes >= max_bytes:
+                yield b"".join(buffer)
+                buffer.clear()
+                buffered_bytes = 0
+        if buffer:
+            yield b"".join(buffer)
+    finally:
+        if pending is not None and not pending.done():
+            pending.cancel()
+            try:
+                await pending
+            except (asyncio.CancelledError, StopAsyncIteration, Exception):
+                pass
+        aclose = getattr(source, "aclose", None)
+        if aclose:
+            await aclose()
+
+
 async def get_browser_tabs_context() -> str:
     """
     Get browser tabs context with state tracking.
@@ -562,7 +681,6 @@ async def lifespan(app: FastAPI):
     For fast startup, we skip initial orders extraction - it will be done
     lazily on first chat message instead.
     """
-    import time
     global browser, graph, checkpointer, initial_orders_context
 
     startup_start = time.time()
@@ -1360,7 +1478,6 @@ async def detect_image_rotation(request: ImageRotationRequest):
     Detect if an image needs rotation correction using Gemini vision.
     Uses the existing key rotation system for rate limit handling.
     """
-    import time
     from models import get_chat_model
 
     start_time = time.time()
@@ -1547,7 +1664,6 @@ async def segment_document(request: DocumentSegmentationRequest):
     If SAM3 is not available, falls back to Gemini vision to detect
     the document region and returns bounding box coordinates.
     """
-    import time
     from io import BytesIO
 
     start_time = time.time()
@@ -1588,7 +1704,6 @@ async def _segment_with_sam3(predictor, base64_data: str, mime_type: str, prompt
     import numpy as np
     from PIL import Image
     from io import BytesIO
-    import time
 
     try:
         # Decode image
@@ -1673,7 +1788,6 @@ async def _segment_with_sam3(predictor, base64_data: str, mime_type: str, prompt
 
 async def _segment_with_gemini(base64_data: str, mime_type: str, prompt: str, padding: int, start_time: float):
     """Fallback: Use Gemini vision to detect document region."""
-    import time
     from models import get_chat_model, increment_usage
     from PIL import Image
     from io import BytesIO
@@ -1965,7 +2079,6 @@ async def preprocess_images(request: ImagePreprocessRequest):
 
     Returns separate images (not composite) for Gemini multi-image support.
     """
-    import time
     from PIL import Image
     from io import BytesIO
     from services.image_labeling import base64_to_image, image_to_base64
@@ -1988,23 +2101,39 @@ async def preprocess_images(request: ImagePreprocessRequest):
     labels = []
     crops = []
 
+    # Decode all images
+    images = []
     for idx, img_data in enumerate(request.images):
-        image_num = idx + 1
-
-        # Decode image
         base64_data = img_data.data
         if base64_data.startswith("data:"):
             base64_data = base64_data.split(",", 1)[1]
+        images.append((base64_to_image(base64_data), idx + 1))
 
-        image = base64_to_image(base64_data)
+    # Create and encode labeled rotation variants (images processed in parallel)
+    label_start = time.time()
+    all_rotation_variants = labeler.encode_labeled_variants_batch(images, max_size=1080)
+    labeling_time += (time.time() - label_start) * 1000
 
-        # Create labeled rotation variants
-        label_start = time.time()
-        rotation_variants = labeler.create_labeled_variants(image, image_num, max_size=1080)
-        labeling_time += (time.time() - label_start) * 1000
+    # Detect and crop documents with YOLOE (one batched inference for all images)
+    prepared_images = []
+    crop_results = []
+    if yoloe is not None:
+        try:
+            yoloe_start = time.time()
+            # Prepare images (EXIF + resize)
+            prepared_images = [labeler.prepare_image(image, max_size=1080) for image, _ in images]
+            crop_results = yoloe.detect_and_crop_batch(
+                prepared_images,
+                confidence_threshold=0.3,
+                padding=10
+            )
+            yoloe_time += (time.time() - yoloe_start) * 1000
+        except Exception as e:
+            logger.warning(f"[Preprocess] YOLOE detection failed: {e}")
+            crop_results = []
 
-        for labeled_img, metadata in rotation_variants:
-            variant_data = image_to_base64(labeled_img)
+    for idx, ((image, image_num), rotation_variants) in enumerate(zip(images, all_rotation_variants)):
+        for variant_data, metadata in rotation_variants:
             variants.append(ImageVariant(
                 data=variant_data,
                 mimeType="image/jpeg",
@@ -2015,26 +2144,18 @@ async def preprocess_images(request: ImagePreprocessRequest):
             ))
             labels.append(LabelInfo(**metadata))
 
-        # Try to detect and crop document with YOLOE
+        # Add crop comparison if YOLOE found a document
         crop_info = CropInfo(imageIndex=image_num, hasCrop=False)
 
-        if yoloe is not None:
+        if crop_results:
             try:
-                yoloe_start = time.time()
-                # Prepare image (EXIF + resize)
-                prepared_image = labeler.prepare_image(image, max_size=1080)
-                cropped, detection = yoloe.detect_and_crop(
-                    prepared_image,
-                    confidence_threshold=0.3,
-                    padding=10
-                )
-                yoloe_time += (time.time() - yoloe_start) * 1000
+                cropped, detection = crop_results[idx]
 
                 if cropped is not None and detection is not None:
                     # Create side-by-side comparison: original vs cropped
                     label_start = time.time()
                     comparison_img, crop_metadata = labeler.create_crop_comparison(
-                        prepared_image, cropped, image_num, max_size=1080
+                        prepared_images[idx], cropped, image_num, max_size=1080
                     )
                     labeling_time += (time.time() - label_start) * 1000
 
@@ -2057,7 +2178,7 @@ async def preprocess_images(request: ImagePreprocessRequest):
                     )
 
             except Exception as e:
-                logger.warning(f"[Preprocess] YOLOE detection failed for image {image_num}: {e}")
+                logger.warning(f"[Preprocess] Crop comparison failed for image {image_num}: {e}")
 
         crops.append(crop_info)
 
@@ -2090,7 +2211,6 @@ async def select_preprocessing(request: SelectPreprocessingRequest):
     Uses configurable model and thinking level.
     Returns AI's choices for each input image.
     """
-    import time
     from models import get_chat_model, increment_usage
 
     start_time = time.time()
@@ -2227,7 +2347,6 @@ async def apply_preprocessing(request: ApplyPreprocessingRequest):
     Returns processed images ready for final AI consumption.
     Also saves processed images to debug folder for inspection.
     """
-    import time
     from PIL import Image, ImageOps
     from io import BytesIO
     from services.image_labeling import base64_to_image, image_to_base64
@@ -2329,8 +2448,6 @@ async def chat_aisdk(request: AISdkChatRequest):
 
     Documentation: https://sdk.vercel.ai/docs/ai-sdk-ui/stream-protocol
     """
-    global orders_context_sent
-
     thread_id = request.chatId or str(uuid.uuid4())
     config = {"configurable": {"thread_id": thread_id}}
 
@@ -2378,8 +2495,9 @@ async def chat_aisdk(request: AISdkChatRequest):
     if not conversation_messages:
         logger.error("[AI SDK] No messages found in request")
         async def error_stream():
-            yield StreamAdapter.error("No messages found")
-            yield StreamAdapter.finish("error")
+            adapter = StreamAdapter()
+            yield adapter.error("No messages found")
+            yield adapter.finish("error")
         return StreamingResponse(
             error_stream(),
             media_type="text/plain",
@@ -2455,9 +2573,10 @@ async def chat_aisdk(request: AISdkChatRequest):
             initial_state = {"messages": conversation_messages}
             context_parts = []
 
-            should_include_orders = is_first_message or not orders_context_sent
+            should_include_orders = is_first_message or not await get_thread_orders_sent(graph, config)
             if should_include_orders and current_context:
                 context_parts.append(current_context)
+                initial_state["orders_context_sent"] = has_valid_orders_context()
             if tabs_context:
                 context_parts.append(tabs_context)
             if context_parts:
@@ -2473,7 +2592,7 @@ async def chat_aisdk(request: AISdkChatRequest):
 
             # Stream events using new AI SDK v6 protocol
             adapter = StreamAdapter()
-            full_response = []
+            full_response = io.StringIO()
             total_input_tokens = 0
             total_output_tokens = 0
             ai_responses = 0  # Track actual AI responses (for usage tracking)
@@ -2494,118 +2613,119 @@ async def chat_aisdk(request: AISdkChatRequest):
             # Retry loop for handling model fallback
             while True:
                 try:
-                    async for event in active_graph.astream_events(
+                    async with aclosing(active_graph.astream_events(
                         initial_state,
                         config,
                         version="v2"
-                    ):
-                        event_type = event.get("event", "")
-
-                        if event_type == "on_tool_start":
-                            tool_name = event.get("name", "unknown")
-                            tool_input = event.get("data", {}).get("input", {})
-                            run_id = event.get("run_id", "")
-                            tool_call_id = f"call_{run_id[:12]}" if run_id else None
-                            # Don't log here - agent.py already logs consolidated summary
-                            yield adapter.tool_status(tool_name, "start", tool_input, tool_call_id=tool_call_id)
-                            # Log tool call if agent logging enabled
-                            if agent_log:
-                                agent_log.log_tool_call(tool_name, tool_input)
-
-                        elif event_type == "on_tool_end":
-                            tool_name = event.get("name", "unknown")
-                            run_id = event.get("run_id", "")
-                            tool_call_id = f"call_{run_id[:12]}" if run_id else None
-                            tool_output = event.get("data", {}).get("output", "")
-
-                            # Extract content from ToolMessage if it's a LangChain message object
-                            if hasattr(tool_output, 'content'):
-                                tool_output = tool_output.content
-
-                            # Parse JSON string to object if possible (for ask_user, etc.)
-                            result_data = tool_output
-                            if isinstance(tool_output, str) and tool_output.startswith('{'):
-                                try:
-                                    result_data = json.loads(tool_output)
-                                except json.JSONDecodeError:
-                                    result_data = tool_output[:500] if tool_output else "completed"
-                            elif tool_output:
-                                result_data = str(tool_output)[:500]
-                            else:
-                                result_data = "completed"
-
-                            # Don't log here - tools.py already logs details
-                            yield adapter.tool_status(tool_name, "end", tool_call_id=tool_call_id, result=result_data)
-                            # Log tool result if agent logging enabled
-                            if agent_log:
-                                agent_log.log_tool_result(tool_name, tool_output)
-
-                        elif event_type == "on_chat_model_stream":
-                            chunk = event["data"].get("chunk")
-                            if chunk and hasattr(chunk, 'content') and chunk.content:
-                                content = chunk.content
-                                if isinstance(content, list):
-                                    text_parts = [p.get('text', '') for p in content if isinstance(p, dict) and p.get('type') == 'text']
-                                    content = ''.join(text_parts)
-                                if content:
-                                    full_response.append(content)
-                                    yield adapter.text_delta(content)
-
-                        elif event_type == "on_chat_model_end":
-                            run_id = event.get("run_id", "")
-                            output = event.get("data", {}).get("output")
-                            event_name = event.get("name", "unknown")
-
-                            # Skip if we've already counted this run_id (avoid double-counting)
-                            if run_id and run_id in counted_run_ids:
-                                continue
-
-                            # LangChain emits on_chat_model_end twice per LLM call:
-                            # 1. From base class (ChatGoogleGenerativeAI)
-                            # 2. From wrapper class (ChatGoogleGenerativeAIWithKeyRotation)
-                            # Only count events from the BASE class to avoid double-counting
-                            if event_name != "ChatGoogleGenerativeAI":
-                                continue
-
-                            if output:
-                                # Only count if LLM returned actual tool_calls or content
-                                has_tool_calls = hasattr(output, 'tool_calls') and output.tool_calls
-                                has_content = False
-                                if hasattr(output, 'content') and output.content:
-                                    content = output.content
-                                    if isinstance(content, str):
-                                        has_content = bool(content.strip())
-                                    elif isinstance(content, list):
-                                        # Check for text content in list format (Gemini 3)
-                                        has_content = any(
-                                            isinstance(p, dict) and p.get('type') == 'text' and p.get('text', '').strip()
-                                            for p in content
-                                        )
-
-                                if has_tool_calls or has_content:
-                                    if run_id:
-                                        counted_run_ids.add(run_id)
-                                    ai_responses += 1
-                                    increment_usage(active_model)
-
-                                # Handle usage metadata
-                                usage = getattr(output, 'usage_metadata', None)
-                                if usage and isinstance(usage, dict):
-                                    total_input_tokens += usage.get('input_tokens', 0) or usage.get('prompt_token_count', 0) or 0
-                                    total_output_tokens += usage.get('output_tokens', 0) or usage.get('candidates_token_count', 0) or 0
-
-                                # If streaming didn't happen, yield the full content here
-                                if not full_response and hasattr(output, 'content') and output.content:
-                                    content = output.content
-                                    if isinstance(content, str) and content:
-                                        full_response.append(content)
-                                        yield adapter.text_delta(content)
-                                    elif isinstance(content, list):
+                    )) as events:
+                        async for event in events:
+                            event_type = event.get("event", "")
+
+                            if event_type == "on_tool_start":
+                                tool_name = event.get("name", "unknown")
+                                tool_input = event.get("data", {}).get("input", {})
+                                run_id = event.get("run_id", "")
+                                tool_call_id = f"call_{run_id[:12]}" if run_id else None
+                                # Don't log here - agent.py already logs consolidated summary
+                                yield adapter.tool_status(tool_name, "start", tool_input, tool_call_id=tool_call_id)
+                                # Log tool call if agent logging enabled
+                                if agent_log:
+                                    agent_log.log_tool_call(tool_name, tool_input)
+
+                            elif event_type == "on_tool_end":
+                                tool_name = event.get("name", "unknown")
+                                run_id = event.get("run_id", "")
+                                tool_call_id = f"call_{run_id[:12]}" if run_id else None
+                                tool_output = event.get("data", {}).get("output", "")
+
+                                # Extract content from ToolMessage if it's a LangChain message object
+                                if hasattr(tool_output, 'content'):
+                                    tool_output = tool_output.content
+
+                                # Parse JSON string to object if possible (for ask_user, etc.)
+                                result_data = tool_output
+                                if isinstance(tool_output, str) and tool_output.startswith('{'):
+                                    try:
+                                        result_data = json.loads(tool_output)
+                                    except json.JSONDecodeError:
+                                        result_data = tool_output[:500] if tool_output else "completed"
+                                elif tool_output:
+                                    result_data = preview_tool_output(tool_output)
+                                else:
+                                    result_data = "completed"
+
+                                # Don't log here - tools.py already logs details
+                                yield adapter.tool_status(tool_name, "end", tool_call_id=tool_call_id, result=result_data)
+                                # Log tool result if agent logging enabled
+                                if agent_log:
+                                    agent_log.log_tool_result(tool_name, tool_output)
+
+                            elif event_type == "on_chat_model_stream":
+                                chunk = event["data"].get("chunk")
+                                if chunk and hasattr(chunk, 'content') and chunk.content:
+                                    content = chunk.content
+                                    if isinstance(content, list):
                                         text_parts = [p.get('text', '') for p in content if isinstance(p, dict) and p.get('type') == 'text']
-                                        text = ''.join(text_parts)
-                                        if text:
-                                            full_response.append(text)
-                                            yield adapter.text_delta(text)
+                                        content = ''.join(text_parts)
+                                    if content:
+                                        full_response.write(content)
+                                        yield adapter.text_delta(content)
+
+                            elif event_type == "on_chat_model_end":
+                                run_id = event.get("run_id", "")
+                                output = event.get("data", {}).get("output")
+                                event_name = event.get("name", "unknown")
+
+                                # Skip if we've already counted this run_id (avoid double-counting)
+                                if run_id and run_id in counted_run_ids:
+                                    continue
+
+                                # LangChain emits on_chat_model_end twice per LLM call:
+                                # 1. From base class (ChatGoogleGenerativeAI)
+                                # 2. From wrapper class (ChatGoogleGenerativeAIWithKeyRotation)
+                                # Only count events from the BASE class to avoid double-counting
+                                if event_name != "ChatGoogleGenerativeAI":
+                                    continue
+
+                                if output:
+                                    # Only count if LLM returned actual tool_calls or content
+                                    has_tool_calls = hasattr(output, 'tool_calls') and output.tool_calls
+                                    has_content = False
+                                    if hasattr(output, 'content') and output.content:
+                                        content = output.content
+                                        if isinstance(content, str):
+                                            has_content = bool(content.strip())
+                                        elif isinstance(content, list):
+                                            # Check for text content in list format (Gemini 3)
+                                            has_content = any(
+                                                isinstance(p, dict) and p.get('type') == 'text' and p.get('text', '').strip()
+                                                for p in content
+                                            )
+
+                                    if has_tool_calls or has_content:
+                                        if run_id:
+                                            counted_run_ids.add(run_id)
+                                        ai_responses += 1
+                                        increment_usage(active_model)
+
+                                    # Handle usage metadata
+                                    usage = getattr(output, 'usage_metadata', None)
+                                    if usage and isinstance(usage, dict):
+                                        total_input_tokens += usage.get('input_tokens', 0) or usage.get('prompt_token_count', 0) or 0
+                                        total_output_tokens += usage.get('output_tokens', 0) or usage.get('candidates_token_count', 0) or 0
+
+                                    # If streaming didn't happen, yield the full content here
+                                    if not full_response.tell() and hasattr(output, 'content') and output.content:
+                                        content = output.content
+                                        if isinstance(content, str) and content:
+                                            full_response.write(content)
+                                            yield adapter.text_delta(content)
+                                        elif isinstance(content, list):
+                                            text_parts = [p.get('text', '') for p in content if isinstance(p, dict) and p.get('type') == 'text']
+                                            text = ''.join(text_parts)
+                                            if text:
+                                                full_response.write(text)
+                                                yield adapter.text_delta(text)
 
                     # Stream completed successfully, exit the retry loop
                     break
@@ -2618,7 +2738,7 @@ async def chat_aisdk(request: AISdkChatRequest):
                         logger.warning(f"[AI SDK] All keys exhausted for {active_model}, switching to {fallback_model}")
                         switch_msg = f"\n\n⚠️ **Límite diario alcanzado para {active_model}**. Cambiando a {fallback_model}...\n\n"
                         yield adapter.text_delta(switch_msg)
-                        full_response.append(switch_msg)
+                        full_response.write(switch_msg)
 
                         # Switch to fallback model
                         active_graph = graphs[fallback_model]
@@ -2626,7 +2746,7 @@ async def chat_aisdk(request: AISdkChatRequest):
                         used_fallback = True
 
                         # Reset state for retry (keep conversation messages, clear partial response context)
-                        full_response = []
+                        full_response = io.StringIO()
                         continue  # Retry with fallback model
                     else:
                         # No fallback available, re-raise the error
@@ -2670,17 +2790,20 @@ async def chat_aisdk(request: AISdkChatRequest):
             yield adapter.finish("stop", usage)
 
             # Log summary
-            response_preview = ''.join(full_response)[:100]
-            logger.info(f"[AI SDK] Done: {ai_responses} AI responses, {total_tokens} tokens, response: {response_preview}...")
+            full_response_text = full_response.getvalue()
+            logger.info(f"[AI SDK] Done: {ai_responses} AI responses, {total_tokens} tokens, response: {full_response_text[:100]}...")
 
             # Save agent log if enabled
             if agent_log:
-                full_response_text = ''.join(full_response)
                 if full_response_text.strip():
                     agent_log.log_ai_response(full_response_text)
                 log_path = agent_log.save()
                 logger.info(f"[AI SDK] Agent conversation log saved: {log_path}")
 
+        except (asyncio.CancelledError, GeneratorExit):
+            # Client disconnected - the graph stream was closed on the way out
+            logger.info(f"[AI SDK] Client disconnected, stream cancelled (thread {thread_id})")
+            raise
         except Exception as e:
             logger.error(f"[AI SDK] Error: {e}", exc_info=True)
             # Log error if agent logging enabled
@@ -2693,7 +2816,7 @@ async def chat_aisdk(request: AISdkChatRequest):
             yield adapter.finish("error")
 
     return StreamingResponse(
-        generate(),
+        coalesce_stream(generate()),
         media_type="text/event-stream",
         headers={
             "x-vercel-ai-ui-message-stream": "v1",
@@ -2708,6 +2831,183 @@ async def chat_aisdk(request: AISdkChatRequest):
 # OPENAI-COMPATIBLE ENDPOINT (Optional - for LobeChat integration)
 # ============================================================
 
+# Closing SSE frames, built once instead of re-serialized per request
+_DONE_FRAME = b"data: [DONE]\n\n"
+# Constant pieces of the finish_reason=stop chunk; only id/created/model vary
+_FINAL_CHUNK_HEAD = b'data: {"id":'
+_FINAL_CHUNK_CREATED = b',"object":"chat.completion.chunk","created":'
+_FINAL_CHUNK_MODEL = b',"model":'
+_FINAL_CHUNK_TAIL = b',"choices":[{"index":0,"delta":{},"finish_reason":"stop"}]}\n\n'
+
+
+def _final_chunk_frame(response_id: str, created_time: int, model: str) -> bytes:
+    """Build the finish_reason=stop chunk by splicing values into prebuilt bytes."""
+    return b"".join((
+        _FINAL_CHUNK_HEAD, orjson.dumps(response_id),
+        _FINAL_CHUNK_CREATED, orjson.dumps(created_time),
+        _FINAL_CHUNK_MODEL, orjson.dumps(model),
+        _FINAL_CHUNK_TAIL,
+    ))
+
+
+def _format_tool_param(key: str, value) -> Optional[str]:
+    """Format a tool input parameter for display, or None to skip it."""
+    if isinstance(value, str):
+        # Truncate long strings
+        display_v = value if len(value) < 50 else value[:47] + "..."
+        return f"{key}={display_v}"
+    if isinstance(value, list):
+        # Show list with all items (truncate if too many)
+        if len(value) <= 10:
+            return f"{key}={value}"
+        shown = ', '.join(str(x) for x in itertools.islice(value, 10))
+        return f"{key}=[{shown}... +{len(value)-10} more]"
+    if isinstance(value, (int, float, bool)):
+        return f"{key}={value}"
+    return None
+
+
+class _OpenAIStreamState:
+    """Per-request state shared by the OpenAI stream event handlers."""
+
+    def __init__(self, response_id: str, created_time: int, model: str, model_name: str):
+        self.response_id = response_id
+        self.created_time = created_time
+        self.model = model  # Model name echoed back to the client
+        self.model_name = model_name  # Internal model used for usage tracking
+        self.full_response = io.StringIO()
+        self.ai_responses = 0
+        self.total_input_tokens = 0
+        self.total_output_tokens = 0
+
+    def chunk(self, content: str) -> bytes:
+        """Format a content delta as an OpenAI chat.completion.chunk SSE frame."""
+        data = {
+            "id": self.response_id,
+            "object": "chat.completion.chunk",
+            "created": self.created_time,
+            "model": self.model,
+            "choices": [{
+                "index": 0,
+                "delta": {"content": content},
+                "finish_reason": None
+            }]
+        }
+        return b"data: " + orjson.dumps(data) + b"\n\n"
+
+
+def _openai_on_tool_start(event: dict, st: _OpenAIStreamState):
+    """Stream tool calls to show "thinking" in LobeChat."""
+    tool_name = event.get("name", "unknown")
+    tool_input = event.get("data", {}).get("input", {})
+    logger.info(f"TOOL CALL: {tool_name}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"  Input: {orjson.dumps(tool_input, default=str).decode()[:500]}")
+
+    # Send tool call as a "thinking" step to frontend
+    tool_display = f"🔧 **{tool_name}**"
+    if tool_input:
+        # Show ALL parameters (formatted lazily, no intermediate list)
+        params = ', '.join(filter(None, (_format_tool_param(k, v) for k, v in tool_input.items())))
+        if params:
+            tool_display += f" ({params})"
+    tool_display += "\n"
+    yield st.chunk(tool_display)
+
+
+def _openai_on_tool_end(event: dict, st: _OpenAIStreamState):
+    """Send a brief tool result indicator."""
+    tool_name = event.get("name", "unknown")
+    tool_output = event.get("data", {}).get("output", "")
+    logger.info(f"TOOL RESULT: {tool_name}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"  Output: {preview_tool_output(tool_output)}")
+    yield st.chunk(f"✓ {tool_name} completado\n\n")
+
+
+def _openai_on_chat_model_stream(event: dict, st: _OpenAIStreamState):
+    """Stream model text deltas."""
+    chunk = event["data"].get("chunk")
+    if chunk and hasattr(chunk, 'content') and chunk.content:
+        # Handle both string and list content (Gemini 3 with thinking)
+        content = chunk.content
+        if isinstance(content, list):
+            # Extract text parts only, skip thinking parts
+            text_parts = [p.get('text', '') for p in content if isinstance(p, dict) and p.get('type') == 'text']
+            content = ''.join(text_parts)
+        if content:
+            st.full_response.write(content)
+            yield st.chunk(content)
+
+
+def _openai_on_chat_model_end(event: dict, st: _OpenAIStreamState):
+    """Handle non-streaming model responses (after key rotation) and extract token usage."""
+    from models import increment_usage
+
+    output = event.get("data", {}).get("output")
+    event_name = event.get("name", "unknown")
+
+    # LangChain emits on_chat_model_end twice per LLM call:
+    # 1. From base class (ChatGoogleGenerativeAI)
+    # 2. From wrapper class (ChatGoogleGenerativeAIWithKeyRotation)
+    # Only count events from the BASE class to avoid double-counting
+    if event_name != "ChatGoogleGenerativeAI":
+        return
+
+    if output:
+        # Count this as an AI response and increment usage
+        st.ai_responses += 1
+        increment_usage(st.model_name)
+
+        # Try to extract token usage from response
+        # Check for usage_metadata on AIMessage (it's a dict, not object)
+        # LangChain format: {'input_tokens': X, 'output_tokens': Y, 'total_tokens': Z}
+        usage = getattr(output, 'usage_metadata', None)
+        if usage and isinstance(usage, dict):
+            input_tokens = usage.get('input_tokens') or usage.get('prompt_token_count', 0) or 0
+            output_tokens = usage.get('output_tokens') or usage.get('candidates_token_count', 0) or 0
+            if input_tokens or output_tokens:
+                st.total_input_tokens += input_tokens
+                st.total_output_tokens += output_tokens
+                # Log thinking tokens if available
+                output_details = usage.get('output_token_details', {})
+                thinking_tokens = output_details.get('reasoning', 0) if output_details else 0
+                logger.info(f"[AI {st.ai_responses}] Tokens: in={input_tokens}, out={output_tokens}" +
+                           (f" (thinking={thinking_tokens})" if thinking_tokens else ""))
+        else:
+            # Fall back to response_metadata (Google-specific format) only when
+            # usage_metadata is missing - avoids reading both and double counting
+            resp_meta = getattr(output, 'response_metadata', None) or {}
+            usage_meta = resp_meta.get('usage_metadata')
+            if usage_meta:
+                # Google format: prompt_token_count, candidates_token_count
+                input_tokens = usage_meta.get('prompt_token_count', 0)
+                output_tokens = usage_meta.get('candidates_token_count', 0)
+                if input_tokens or output_tokens:
+                    st.total_input_tokens += input_tokens
+                    st.total_output_tokens += output_tokens
+                    logger.info(f"[AI {st.ai_responses}] Tokens (from response_meta): in={input_tokens}, out={output_tokens}")
+
+    if output and hasattr(output, 'content') and output.content:
+        content = output.content
+        if isinstance(content, list):
+            text_parts = [p.get('text', '') for p in content if isinstance(p, dict) and p.get('type') == 'text']
+            content = ''.join(text_parts)
+        # Only send if we haven't already streamed this content
+        if content and content not in st.full_response.getvalue():
+            st.full_response.write(content)
+            yield st.chunk(content)
+
+
+# Event type -> handler (astream_events emits many more types; unhandled ones are skipped)
+_OPENAI_EVENT_HANDLERS = {
+    "on_tool_start": _openai_on_tool_start,
+    "on_tool_end": _openai_on_tool_end,
+    "on_chat_model_stream": _openai_on_chat_model_stream,
+    "on_chat_model_end": _openai_on_chat_model_end,
+}
+
+
 class OpenAIChatRequest(BaseModel):
     model: str
     messages: List[dict]
@@ -2723,8 +3023,6 @@ async def openai_compatible_chat(request: OpenAIChatRequest):
     This translates OpenAI format to our LangGraph agent format,
     allowing LobeChat to use our agent as a model provider.
     """
-    import time as time_module
-
     # Debug: log raw request
     logger.debug(f"[Request] Messages count: {len(request.messages)}")
     for i, msg in enumerate(request.messages):
@@ -2759,8 +3057,8 @@ async def openai_compatible_chat(request: OpenAIChatRequest):
             if any(keyword in content for keyword in ["summarizer", "summarize", "title", "translate", "translation", "compress"]):
                 logger.info(f"[Request] Skipping auxiliary request (topic naming/translation)")
                 # Return a simple response without invoking the agent
-                response_id = f"chatcmpl-{uuid.uuid4().hex[:8]}"
-                created_time = int(time_module.time())
+                response_id = f"chatcmpl-{secrets.token_hex(4)}"
+                created_time = time.time_ns() // 1_000_000_000
                 if request.stream:
                     async def simple_stream():
                         data = {
@@ -2770,16 +3068,9 @@ async def openai_compatible_chat(request: OpenAIChatRequest):
                             "model": request.model,
                             "choices": [{"index": 0, "delta": {"content": "Lab Assistant"}, "finish_reason": None}]
                         }
-                        yield f"data: {json.dumps(data)}\n\n"
-                        final = {
-                            "id": response_id,
-                            "object": "chat.completion.chunk",
-                            "created": created_time,
-                            "model": request.model,
-                            "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]
-                        }
-                        yield f"data: {json.dumps(final)}\n\n"
-                        yield "data: [DONE]\n\n"
+                        yield b"data: " + orjson.dumps(data) + b"\n\n"
+                        yield _final_chunk_frame(response_id, created_time, request.model)
+                        yield _DONE_FRAME
                     return StreamingResponse(simple_stream(), media_type="text/event-stream")
                 else:
                     return {
@@ -2880,18 +3171,14 @@ async def openai_compatible_chat(request: OpenAIChatRequest):
 
     if request.stream:
         async def generate():
-            global orders_context_sent
-            full_response = []
-            response_id = f"chatcmpl-{uuid.uuid4().hex[:8]}"  # Same ID for all chunks
-            created_time = int(time_module.time())  # Unix timestamp
+            response_id = f"chatcmpl-{secrets.token_hex(4)}"  # Same ID for all chunks
+            created_time = time.time_ns() // 1_000_000_000  # Unix timestamp
 
-            # Track AI responses (for usage tracking)
-            ai_responses = 0
-            total_input_tokens = 0
-            total_output_tokens = 0
+            # Shared by event handlers: response text, AI responses and token usage
+            st = _OpenAIStreamState(response_id, created_time, request.model, model_name)
 
             # Import usage tracking
-            from models import increment_usage, get_usage_stats, get_daily_limit
+            from models import get_usage_stats, get_daily_limit
 
             # Gemini pricing (per 1M tokens) - adjust based on model
             # Gemini 3 Flash Preview: $0.50 input, $3.00 output (incl. thinking tokens)
@@ -2918,8 +3205,9 @@ async def openai_compatible_chat(request: OpenAIChatRequest):
                 # Build full context
                 context_parts = []
 
-                # Include orders context if: first message OR we haven't sent valid orders yet
-                should_include_orders = is_first_message or not orders_context_sent
+                # Each request runs on a fresh thread, so there is no checkpointed flag to read.
+                # Include orders on the first message, or while no valid orders table exists yet
+                should_include_orders = is_first_message or not has_valid_orders_context()
                 if should_include_orders and current_context:
                     context_parts.append(current_context)
                     if "SESIÓN NO INICIADA" in current_context:
@@ -2935,173 +3223,25 @@ async def openai_compatible_chat(request: OpenAIChatRequest):
                 if context_parts:
                     initial_state["current_page_context"] = "\n\n".join(context_parts)
 
-                async for event in graph.astream_events(
+                async with aclosing(graph.astream_events(
                     initial_state,
                     config,
                     version="v2"
-                ):
-                    event_type = event.get("event", "")
-
-                    # Note: AI response counting now done in on_chat_model_end
-                    if event_type == "on_chat_model_start":
-                        pass  # Used for debugging only if needed
-
-                    # Stream tool calls to show "thinking" in LobeChat
-                    if event_type == "on_tool_start":
-                        tool_name = event.get("name", "unknown")
-                        tool_input = event.get("data", {}).get("input", {})
-                        logger.info(f"TOOL CALL: {tool_name}")
-                        logger.debug(f"  Input: {json.dumps(tool_input, ensure_ascii=False)[:500]}")
-
-                        # Send tool call as a "thinking" step to frontend
-                        tool_display = f"🔧 **{tool_name}**"
-                        if tool_input:
-                            # Show ALL parameters
-                            params = []
-                            for k, v in tool_input.items():
-                                if isinstance(v, str):
-                                    # Truncate long strings
-                                    display_v = v if len(v) < 50 else v[:47] + "..."
-                                    params.append(f"{k}={display_v}")
-                                elif isinstance(v, list):
-                                    # Show list with all items (truncate if too many)
-                                    if len(v) <= 10:
-                                        params.append(f"{k}={v}")
-                                    else:
-                                        params.append(f"{k}=[{', '.join(str(x) for x in v[:10])}... +{len(v)-10} more]")
-                                elif isinstance(v, (int, float, bool)):
-                                    params.append(f"{k}={v}")
-                            if params:
-                                tool_display += f" ({', '.join(params)})"
-                        tool_display += "\n"
-
-                        data = {
-                            "id": response_id,
-                            "object": "chat.completion.chunk",
-                            "created": created_time,
-                            "model": request.model,
-                            "choices": [{
-                                "index": 0,
-                                "delta": {"content": tool_display},
-                                "finish_reason": None
-                            }]
-                        }
-                        yield f"data: {json.dumps(data)}\n\n"
-
-                    elif event_type == "on_tool_end":
-                        tool_name = event.get("name", "unknown")
-                        tool_output = event.get("data", {}).get("output", "")
-                        logger.info(f"TOOL RESULT: {tool_name}")
-                        logger.debug(f"  Output: {str(tool_output)[:500]}")
-
-                        # Send brief result indicator
-                        result_display = f"✓ {tool_name} completado\n\n"
-                        data = {
-                            "id": response_id,
-                            "object": "chat.completion.chunk",
-                            "created": created_time,
-                            "model": request.model,
-                            "choices": [{
-                                "index": 0,
-                                "delta": {"content": result_display},
-                                "finish_reason": None
-                            }]
-                        }
-                        yield f"data: {json.dumps(data)}\n\n"
-
-                    elif event_type == "on_chat_model_stream":
-                        chunk = event["data"].get("chunk")
-                        if chunk and hasattr(chunk, 'content') and chunk.content:
-                            # Handle both string and list content (Gemini 3 with thinking)
-                            content = chunk.content
-                            if isinstance(content, list):
-                                # Extract text parts only, skip thinking parts
-                                text_parts = [p.get('text', '') for p in content if isinstance(p, dict) and p.get('type') == 'text']
-                                content = ''.join(text_parts)
-                            if content:
-                                full_response.append(content)
-                                data = {
-                                    "id": response_id,
-                                    "object": "chat.completion.chunk",
-                                    "created": created_time,
-                                    "model": request.model,
-                                    "choices": [{
-                                        "index": 0,
-                                        "delta": {"content": content},
-                                        "finish_reason": None
-                                    }]
-                                }
-                                yield f"data: {json.dumps(data)}\n\n"
-
-                    # Handle non-streaming model responses (after key rotation) and extract token usage
-                    elif event_type == "on_chat_model_end":
-                        output = event.get("data", {}).get("output")
-                        event_name = event.get("name", "unknown")
-
-                        # LangChain emits on_chat_model_end twice per LLM call:
-                        # 1. From base class (ChatGoogleGenerativeAI)
-                        # 2. From wrapper class (ChatGoogleGenerativeAIWithKeyRotation)
-                        # Only count events from the BASE class to avoid double-counting
-                        if event_name != "ChatGoogleGenerativeAI":
+                )) as events:
+                    async for event in events:
+                        handler = _OPENAI_EVENT_HANDLERS.get(event.get("event", ""))
+                        if handler is None:
                             continue
+                        for frame in handler(event, st):
+                            yield frame
 
-                        if output:
-                            # Count this as an AI response and increment usage
-                            ai_responses += 1
-                            increment_usage(model_name)
-
-                            # Try to extract token usage from response
-                            # Check for usage_metadata on AIMessage (it's a dict, not object)
-                            # LangChain format: {'input_tokens': X, 'output_tokens': Y, 'total_tokens': Z}
-                            usage = getattr(output, 'usage_metadata', None)
-                            if usage and isinstance(usage, dict):
-                                input_tokens = usage.get('input_tokens', 0) or usage.get('prompt_token_count', 0) or 0
-                                output_tokens = usage.get('output_tokens', 0) or usage.get('candidates_token_count', 0) or 0
-                                if input_tokens or output_tokens:
-                                    total_input_tokens += input_tokens
-                                    total_output_tokens += output_tokens
-                                    # Log thinking tokens if available
-                                    output_details = usage.get('output_token_details', {})
-                                    thinking_tokens = output_details.get('reasoning', 0) if output_details else 0
-                                    logger.info(f"[AI {ai_responses}] Tokens: in={input_tokens}, out={output_tokens}" +
-                                               (f" (thinking={thinking_tokens})" if thinking_tokens else ""))
-
-                            # Also check response_metadata for langchain (Google-specific format)
-                            resp_meta = getattr(output, 'response_metadata', {}) or {}
-                            if resp_meta and 'usage_metadata' in resp_meta:
-                                usage_meta = resp_meta['usage_metadata']
-                                # Google format: prompt_token_count, candidates_token_count
-                                input_tokens = usage_meta.get('prompt_token_count', 0)
-                                output_tokens = usage_meta.get('candidates_token_count', 0)
-                                # Avoid double counting - only add if we didn't get from usage_metadata above
-                                if (input_tokens or output_tokens) and not usage:
-                                    total_input_tokens += input_tokens
-                                    total_output_tokens += output_tokens
-                                    logger.info(f"[AI {ai_responses}] Tokens (from response_meta): in={input_tokens}, out={output_tokens}")
-
-                        if output and hasattr(output, 'content') and output.content:
-                            content = output.content
-                            if isinstance(content, list):
-                                text_parts = [p.get('text', '') for p in content if isinstance(p, dict) and p.get('type') == 'text']
-                                content = ''.join(text_parts)
-                            # Only send if we haven't already streamed this content
-                            if content and content not in ''.join(full_response):
-                                full_response.append(content)
-                                data = {
-                                    "id": response_id,
-                                    "object": "chat.completion.chunk",
-                                    "created": created_time,
-                                    "model": request.model,
-                                    "choices": [{
-                                        "index": 0,
-                                        "delta": {"content": content},
-                                        "finish_reason": None
-                                    }]
-                                }
-                                yield f"data: {json.dumps(data)}\n\n"
-
-                if full_response:
-                    logger.info(f"AI RESPONSE: {''.join(full_response)[:300]}{'...' if len(''.join(full_response)) > 300 else ''}")
+                ai_responses = st.ai_responses
+                total_input_tokens = st.total_input_tokens
+                total_output_tokens = st.total_output_tokens
+
+                response_str = st.full_response.getvalue()
+                if response_str:
+                    logger.info(f"AI RESPONSE: {response_str[:300]}{'...' if len(response_str) > 300 else ''}")
 
                 # Calculate and display usage summary
                 total_tokens = total_input_tokens + total_output_tokens
@@ -3120,43 +3260,24 @@ async def openai_compatible_chat(request: OpenAIChatRequest):
                     usage_summary += f" | Tokens: {total_input_tokens:,} in + {total_output_tokens:,} out"
                     usage_summary += f" | ${total_cost:.6f}"
                 usage_summary += "\n"
-
-                data = {
-                    "id": response_id,
-                    "object": "chat.completion.chunk",
-                    "created": created_time,
-                    "model": request.model,
-                    "choices": [{
-                        "index": 0,
-                        "delta": {"content": usage_summary},
-                        "finish_reason": None
-                    }]
-                }
-                yield f"data: {json.dumps(data)}\n\n"
+                yield st.chunk(usage_summary)
 
                 logger.info(f"[Usage] AI responses: {ai_responses}, Input: {total_input_tokens}, Output: {total_output_tokens}, Cost: ${total_cost:.6f}")
 
                 # Send final chunk with finish_reason to signal completion
-                final_chunk = {
-                    "id": response_id,
-                    "object": "chat.completion.chunk",
-                    "created": created_time,
-                    "model": request.model,
-                    "choices": [{
-                        "index": 0,
-                        "delta": {},
-                        "finish_reason": "stop"
-                    }]
-                }
-                yield f"data: {json.dumps(final_chunk)}\n\n"
-                yield "data: [DONE]\n\n"
+                yield _final_chunk_frame(response_id, created_time, request.model)
+                yield _DONE_FRAME
 
+            except (asyncio.CancelledError, GeneratorExit):
+                # Client disconnected - the graph stream was closed on the way out
+                logger.info(f"Client disconnected, stream cancelled (thread {thread_id})")
+                raise
             except Exception as e:
                 logger.error(f"Stream error: {str(e)}", exc_info=True)
-                yield f"data: {json.dumps({'error': str(e)})}\n\n"
+                yield b"data: " + orjson.dumps({"error": str(e)}) + b"\n\n"
 
         return StreamingResponse(
-            generate(),
+            coalesce_stream(generate()),
             media_type="text/event-stream",
             headers={
                 "Cache-Control": "no-cache",
@@ -3186,8 +3307,9 @@ async def openai_compatible_chat(request: OpenAIChatRequest):
             # Build full context
             context_parts = []
 
-            # Include orders context if: first message OR we haven't sent valid orders yet
-            should_include_orders = is_first_message or not orders_context_sent
+            # Each request runs on a fresh thread, so there is no checkpointed flag to read.
+            # Include orders on the first message, or while no valid orders table exists yet
+            should_include_orders = is_first_message or not has_valid_orders_context()
             if should_include_orders and current_context:
                 context_parts.append(current_context)
                 if "SESIÓN NO INICIADA" in current_context:
@@ -3213,7 +3335,7 @@ async def openai_compatible_chat(request: OpenAIChatRequest):
                 if hasattr(msg, 'tool_calls') and msg.tool_calls:
                     logger.info(f"  [{i}] {msg_type}: {len(msg.tool_calls)} tool calls")
                     for tc in msg.tool_calls:
-                        logger.info(f"      -> {tc.get('name', 'unknown')}: {json.dumps(tc.get('args', {}), ensure_ascii=False)[:200]}")
+                        logger.info(f"      -> {tc.get('name', 'unknown')}: {orjson.dumps(tc.get('args', {}), default=str).decode()[:200]}")
                 else:
                     logger.info(f"  [{i}] {msg_type}: {content[:150]}{'...' if len(content) > 150 else ''}")
 
@@ -3224,7 +3346,7 @@ async def openai_compatible_chat(request: OpenAIChatRequest):
             logger.info("=" * 60)
 
             return {
-                "id": f"chatcmpl-{uuid.uuid4().hex[:8]}",
+                "id": f"chatcmpl-{secrets.token_hex(4)}",
                 "object": "chat.completion",
                 "model": request.model,
                 "choices": [{
@@ -3239,7 +3361,7 @@ async def openai_compatible_chat(request: OpenAIChatRequest):
         except Exception as e:
             logger.error(f"Error invoking agent: {str(e)}", exc_info=True)
             return {
-                "id": f"chatcmpl-{uuid.uuid4().hex[:8]}",
+                "id": f"chatcmpl-{secrets.token_hex(4)}",
                 "object": "chat.completion",
                 "model": request.model,
                 "choices": [{
@@ -9,11 +9,24 @@ Handles:
 
 import io
 import logging
-from typing import Dict, List, Tuple
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
 from PIL import Image, ImageDraw, ImageFont, ImageOps
 
 logger = logging.getLogger(__name__)
 
+# Optional libjpeg-turbo encoder (SIMD DCT) - falls back to PIL if unavailable
+try:
+    from turbojpeg import TurboJPEG, TJPF_RGB, TJSAMP_420
+    _turbojpeg = TurboJPEG()
+except Exception as e:  # ImportError, or RuntimeError if the shared library is missing
+    logger.debug(f"TurboJPEG not available, using PIL for JPEG encoding: {e}")
+    _turbojpeg = None
+
 
 class ImageLabelingService:
     """
@@ -24,10 +37,14 @@ class ImageLabelingService:
     FONT_SIZE_RATIO = 0.05  # 5% of image height
     MIN_FONT_SIZE = 16
     MAX_FONT_SIZE = 48
+    FONT_SIZE_STEP = 2  # Sizes snap to this grid so the preloaded cache always hits
     LABEL_BG_COLOR = (255, 255, 255)  # White
     LABEL_TEXT_COLOR = (0, 0, 0)  # Black
     LABEL_PADDING = 10
 
+    # Box-reduce large downscales before the resample filter (Pillow's reducing_gap)
+    RESIZE_REDUCING_GAP = 3.0
+
     # Common font paths to try
     FONT_PATHS = [
         "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
@@ -39,32 +56,96 @@ class ImageLabelingService:
 
     def __init__(self):
         self._font_cache: Dict[int, ImageFont.FreeTypeFont] = {}
+        self._text_width_cache: Dict[Tuple[int, str], int] = {}
+        self._font_lock = threading.Lock()
+
+        # Resolve the font file once and preload every size we can hand out,
+        # so TrueType parsing never happens on the request path
+        self._font_path = self._find_font_path()
+        for size in range(self.MIN_FONT_SIZE, self.MAX_FONT_SIZE + 1, self.FONT_SIZE_STEP):
+            self._font_cache[size] = self._load_font(size)
 
     def _get_font(self, size: int) -> ImageFont.FreeTypeFont:
-        """Get font of specified size, with caching."""
+        """Get font of specified size, with caching (thread-safe)."""
         if size in self._font_cache:
             return self._font_cache[size]
 
-        font = None
+        with self._font_lock:
+            if size not in self._font_cache:
+                self._font_cache[size] = self._load_font(size)
+        return self._font_cache[size]
+
+    def _find_font_path(self) -> Optional[str]:
+        """Find the first usable TrueType font in FONT_PATHS."""
         for path in self.FONT_PATHS:
             try:
-                font = ImageFont.truetype(path, size)
-                break
+                ImageFont.truetype(path, self.MIN_FONT_SIZE)
+                return path
             except (OSError, IOError):
                 continue
 
-        if font is None:
-            logger.warning("No TrueType fonts found, using default font")
-            font = ImageFont.load_default()
+        logger.warning("No TrueType fonts found, using default font")
+        return None
 
-        self._font_cache[size] = font
-        return font
+    def _load_font(self, size: int) -> ImageFont.FreeTypeFont:
+        """Load the resolved TrueType font at the given size."""
+        if self._font_path is None:
+            return ImageFont.load_default()
+        return ImageFont.truetype(self._font_path, size)
 
     def _calculate_font_size(self, image_height: int) -> int:
-        """Calculate appropriate font size based on image height."""
+        """Calculate appropriate font size based on image height (snapped to FONT_SIZE_STEP)."""
         size = int(image_height * self.FONT_SIZE_RATIO)
+        size = (size + self.FONT_SIZE_STEP // 2) // self.FONT_SIZE_STEP * self.FONT_SIZE_STEP
         return max(self.MIN_FONT_SIZE, min(size, self.MAX_FONT_SIZE))
 
+    def _measure_text(self, label: str, font_size: int) -> int:
+        """Get rendered text width for a label, with caching."""
+        key = (font_size, label)
+        if key not in self._text_width_cache:
+            font = self._get_font(font_size)
+            bbox = font.getbbox(label)
+            self._text_width_cache[key] = bbox[2] - bbox[0]
+        return self._text_width_cache[key]
+
+    def _blank_label_bar(self, width: int, image_height: int) -> Image.Image:
+        """Create an empty (white) label bar sized for an image of this shape."""
+        label_height = self._calculate_font_size(image_height) + self.LABEL_PADDING * 2
+        return Image.new('RGB', (width, label_height), self.LABEL_BG_COLOR)
+
+    def _make_label_bar(
+        self,
+        width: int,
+        image_height: int,
+        label: str,
+        template: Optional[Image.Image] = None
+    ) -> np.ndarray:
+        """
+        Render the white label bar with centered black text.
+
+        Args:
+            width: Bar width (same as the image it labels)
+            image_height: Height of the labeled image (sets font size)
+            label: Text label to draw
+            template: Optional blank bar from _blank_label_bar to copy
+                instead of allocating and filling a new one
+
+        Returns:
+            RGB array of shape (label_height, width, 3)
+        """
+        font_size = self._calculate_font_size(image_height)
+
+        if template is not None:
+            bar = template.copy()
+        else:
+            bar = self._blank_label_bar(width, image_height)
+        text_x = (width - self._measure_text(label, font_size)) // 2
+        ImageDraw.Draw(bar).text(
+            (text_x, self.LABEL_PADDING), label,
+            fill=self.LABEL_TEXT_COLOR, font=self._get_font(font_size)
+        )
+        return np.asarray(bar)
+
     def add_label(self, image: Image.Image, label: str) -> Image.Image:
         """
         Add text label to TOP of image.
@@ -72,61 +153,47 @@ class ImageLabelingService:
         Creates a white bar at top with centered black text.
 
         Args:
-            image: PIL Image to label
+            image: PIL Image to label (RGB)
             label: Text label to add
 
         Returns:
             New image with label bar added
         """
-        width, height = image.size
+        return self._label_pixels(np.asarray(image), label)
 
-        # Calculate font size and label height
-        font_size = self._calculate_font_size(height)
-        label_height = font_size + self.LABEL_PADDING * 2
-
-        # Create new image with space for label
-        new_height = height + label_height
-        new_image = Image.new('RGB', (width, new_height), self.LABEL_BG_COLOR)
-
-        # Draw label text
-        draw = ImageDraw.Draw(new_image)
-        font = self._get_font(font_size)
-
-        # Get text bounding box for centering
-        text_bbox = draw.textbbox((0, 0), label, font=font)
-        text_width = text_bbox[2] - text_bbox[0]
-        text_x = (width - text_width) // 2
-        text_y = self.LABEL_PADDING
-
-        draw.text((text_x, text_y), label, fill=self.LABEL_TEXT_COLOR, font=font)
-
-        # Paste original image below label
-        new_image.paste(image, (0, label_height))
-
-        return new_image
+    def _label_pixels(
+        self,
+        pixels: np.ndarray,
+        label: str,
+        template: Optional[Image.Image] = None
+    ) -> Image.Image:
+        """
+        Stack a label bar over an RGB pixel array and build the final image.
 
-    def create_rotations(self, image: Image.Image) -> Dict[int, Image.Image]:
+        `pixels` may be a non-contiguous view (e.g. from np.rot90); the
+        concatenation is the only full-image copy.
         """
-        Create all 4 rotation variants.
+        height, width = pixels.shape[:2]
+        bar = self._make_label_bar(width, height, label, template)
+        return Image.fromarray(np.concatenate([bar, pixels], axis=0))
 
-        Args:
-            image: PIL Image to rotate
+    @staticmethod
+    def _rotation_views(pixels: np.ndarray) -> Iterator[Tuple[int, np.ndarray]]:
+        """
+        Yield (rotation_angle, view) for 0, 90, 180 and 270 degrees.
 
-        Returns:
-            Dict mapping rotation angle to rotated image:
-            {0: original, 90: rotated_90, 180: rotated_180, 270: rotated_270}
+        Exact 90° multiples are pure memory transposes: np.rot90 returns
+        views without copying or running an interpolation kernel.
         """
-        return {
-            0: image.copy(),
-            90: image.rotate(-90, expand=True),  # Negative = clockwise
-            180: image.rotate(180, expand=True),
-            270: image.rotate(-270, expand=True),  # Same as rotate(90)
-        }
+        for rotation, k in ((0, 0), (90, -1), (180, 2), (270, 1)):  # Negative k = clockwise
+            yield rotation, np.rot90(pixels, k)
 
     def resize_if_needed(
         self,
         image: Image.Image,
-        max_size: int = 1080
+        max_size: int = 1080,
+        resample: Image.Resampling = Image.Resampling.LANCZOS,
+        in_place: bool = False
     ) -> Image.Image:
         """
         Resize image to max dimension if larger, preserving aspect ratio.
@@ -134,6 +201,9 @@ class ImageLabelingService:
         Args:
             image: PIL Image to resize
             max_size: Maximum width or height (default: 1080)
+            resample: Resampling filter (default: LANCZOS, best for OCR)
+            in_place: Resize `image` itself with Image.thumbnail (only when
+                the caller owns the image and doesn't need the original)
 
         Returns:
             Resized image (or original if already small enough)
@@ -144,6 +214,11 @@ class ImageLabelingService:
         if width <= max_size and height <= max_size:
             return image
 
+        if in_place:
+            image.thumbnail((max_size, max_size), resample, reducing_gap=self.RESIZE_REDUCING_GAP)
+            logger.debug(f"Resized image in place from {width}x{height} to {image.width}x{image.height}")
+            return image
+
         # Calculate new dimensions
         if width > height:
             new_width = max_size
@@ -154,7 +229,9 @@ class ImageLabelingService:
 
         logger.debug(f"Resizing image from {width}x{height} to {new_width}x{new_height}")
 
-        return image.resize((new_width, new_height), Image.Resampling.LANCZOS)
+        return image.resize(
+            (new_width, new_height), resample, reducing_gap=self.RESIZE_REDUCING_GAP
+        )
 
     def prepare_image(self, image: Image.Image, max_size: int = 1080) -> Image.Image:
         """
@@ -165,13 +242,15 @@ class ImageLabelingService:
             max_size: Maximum width or height
 
         Returns:
-            Prepared image (EXIF corrected, resized if needed)
+            Prepared image (EXIF corrected, resized if needed, always RGB).
+            Everything downstream (rotations, crops, comparisons, encoding)
+            relies on this RGB guarantee and does not re-check the mode.
         """
-        # Apply EXIF rotation to fix orientation
+        # Apply EXIF rotation to fix orientation (returns a new image we own)
         image = ImageOps.exif_transpose(image)
 
         # Resize if too large
-        image = self.resize_if_needed(image, max_size)
+        image = self.resize_if_needed(image, max_size, in_place=True)
 
         # Ensure RGB mode (no alpha channel)
         if image.mode != 'RGB':
@@ -184,17 +263,20 @@ class ImageLabelingService:
         image: Image.Image,
         image_index: int,
         max_size: int = 1080
-    ) -> List[Tuple[Image.Image, dict]]:
+    ) -> Iterator[Tuple[Image.Image, dict]]:
         """
         Create all labeled rotation variants for an image.
 
+        Variants are yielded one at a time so callers can encode and drop
+        each before the next is built (one full-size variant alive at once).
+
         Args:
             image: PIL Image to process
             image_index: 1-based index for labeling
             max_size: Maximum dimension for resize
 
-        Returns:
-            List of (labeled_image, metadata) tuples where metadata is:
+        Yields:
+            (labeled_image, metadata) tuples where metadata is:
             {
                 "imageIndex": int,
                 "label": str,
@@ -202,17 +284,21 @@ class ImageLabelingService:
                 "rotation": int
             }
         """
-        # Prepare image (EXIF + resize)
+        # Prepare image (EXIF + resize + RGB), then work on one pixel array:
+        # rotations are np.rot90 views and the label stack is the only copy
         image = self.prepare_image(image, max_size)
+        pixels = np.asarray(image)
 
-        # Create rotations
-        rotations = self.create_rotations(image)
+        # Blank label bars keyed by view shape: 0°/180° share one, 90°/270° the other
+        templates: Dict[Tuple[int, int], Image.Image] = {}
 
         # Add labels to each rotation
-        variants = []
-        for rotation, rotated_img in rotations.items():
+        for rotation, rotated in self._rotation_views(pixels):
             label = f"{image_index}: {rotation}°"
-            labeled = self.add_label(rotated_img, label)
+            shape = rotated.shape[:2]
+            if shape not in templates:
+                templates[shape] = self._blank_label_bar(shape[1], shape[0])
+            labeled = self._label_pixels(rotated, label, templates[shape])
 
             metadata = {
                 "imageIndex": image_index,
@@ -221,9 +307,59 @@ class ImageLabelingService:
                 "rotation": rotation
             }
 
-            variants.append((labeled, metadata))
+            yield labeled, metadata
+
+    def encode_labeled_variants(
+        self,
+        image: Image.Image,
+        image_index: int,
+        max_size: int = 1080
+    ) -> List[Tuple[str, dict]]:
+        """
+        Create labeled rotation variants and encode each to base64 JPEG.
+
+        Each labeled image is released as soon as it is encoded, so only
+        the small base64 strings accumulate.
+
+        Returns:
+            List of (base64_data, metadata) tuples (metadata as in
+            create_labeled_variants)
+        """
+        return [
+            (image_to_base64(labeled), metadata)
+            for labeled, metadata in self.create_labeled_variants(image, image_index, max_size)
+        ]
+
+    def encode_labeled_variants_batch(
+        self,
+        images: List[Tuple[Image.Image, int]],
+        max_size: int = 1080,
+        max_workers: Optional[int] = None
+    ) -> List[List[Tuple[str, dict]]]:
+        """
+        Create and encode labeled rotation variants for several images in parallel.
+
+        Images are independent and Pillow releases the GIL during resize,
+        rotate and encode, so a thread pool scales across cores.
 
-        return variants
+        Args:
+            images: List of (image, image_index) tuples
+            max_size: Maximum dimension for resize
+            max_workers: Thread count (default: one per CPU, capped at len(images))
+
+        Returns:
+            One encoded variants list per input image, in input order
+            (same format as encode_labeled_variants)
+        """
+        if len(images) <= 1:
+            return [self.encode_labeled_variants(img, idx, max_size) for img, idx in images]
+
+        workers = min(max_workers or os.cpu_count() or 1, len(images))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(
+                lambda item: self.encode_labeled_variants(item[0], item[1], max_size),
+                images
+            ))
 
     def create_crop_comparison(
         self,
@@ -239,24 +375,20 @@ class ImageLabelingService:
         Right side: Cropped (Crop=True)
 
         Args:
-            original_image: Original PIL Image (already prepared)
-            cropped_image: Cropped PIL Image
+            original_image: Original PIL Image (already prepared, RGB)
+            cropped_image: Cropped PIL Image (crop of the prepared image, RGB)
             image_index: 1-based index for labeling
             max_size: Maximum dimension for each side
 
         Returns:
             (comparison_image, metadata) tuple
         """
-        # Resize both to fit in comparison
+        # Resize both to fit in comparison (half-size previews - BILINEAR is
+        # indistinguishable from LANCZOS here and much cheaper)
         half_max = max_size // 2
-        original_resized = self.resize_if_needed(original_image.copy(), half_max)
-        cropped_resized = self.resize_if_needed(cropped_image, half_max)
-
-        # Ensure RGB
-        if original_resized.mode != 'RGB':
-            original_resized = original_resized.convert('RGB')
-        if cropped_resized.mode != 'RGB':
-            cropped_resized = cropped_resized.convert('RGB')
+        bilinear = Image.Resampling.BILINEAR
+        original_resized = self.resize_if_needed(original_image.copy(), half_max, bilinear, in_place=True)
+        cropped_resized = self.resize_if_needed(cropped_image, half_max, bilinear)
 
         # Make both same height for clean side-by-side
         max_height = max(original_resized.height, cropped_resized.height)
@@ -310,7 +442,7 @@ class ImageLabelingService:
         Create labeled cropped variant.
 
         Args:
-            cropped_image: Already cropped PIL Image
+            cropped_image: Already cropped PIL Image (RGB, from a prepared image)
             image_index: 1-based index for labeling
             max_size: Maximum dimension for resize
 
@@ -320,10 +452,6 @@ class ImageLabelingService:
         # Resize if needed
         cropped_image = self.resize_if_needed(cropped_image, max_size)
 
-        # Ensure RGB
-        if cropped_image.mode != 'RGB':
-            cropped_image = cropped_image.convert('RGB')
-
         # Add label
         label = f"{image_index}: cropped"
         labeled = self.add_label(cropped_image, label)
@@ -342,7 +470,7 @@ def image_to_base64(image: Image.Image, format: str = 'JPEG', quality: int = 90)
     Convert PIL Image to base64 string.
 
     Args:
-        image: PIL Image
+        image: RGB PIL Image (see ImageLabelingService.prepare_image)
         format: Image format (JPEG, PNG, etc.)
         quality: JPEG quality (1-100)
 
@@ -351,12 +479,15 @@ def image_to_base64(image: Image.Image, format: str = 'JPEG', quality: int = 90)
     """
     import base64
 
-    buffer = io.BytesIO()
-
-    # Ensure RGB for JPEG
-    if format.upper() == 'JPEG' and image.mode != 'RGB':
-        image = image.convert('RGB')
+    if _turbojpeg is not None and format.upper() == 'JPEG':
+        # 4:2:0 subsampling matches PIL's default at this quality
+        data = _turbojpeg.encode(
+            np.asarray(image), quality=quality,
+            pixel_format=TJPF_RGB, jpeg_subsample=TJSAMP_420
+        )
+        return base64.b64encode(data).decode('utf-8')
 
+    buffer = io.BytesIO()
     image.save(buffer, format=format, quality=quality)
     buffer.seek(0)
 
@@ -17,72 +17,109 @@ Stream Format (SSE):
 - data: {"type":"finish"}
 - data: [DONE]
 """
-import json
-import uuid
+import secrets
+from collections import defaultdict, deque
 from typing import Any, Optional
 
+import orjson
+
+# Closing part of a text-delta frame (prefix is built per text block)
+_DELTA_SUFFIX = b"}\n\n"
+
+# Frames are returned as bytes so the ASGI layer doesn't re-encode them
+_dumps = orjson.dumps
+
+# Tool outputs can carry numpy values, datetimes, UUIDs or int-keyed dicts;
+# anything orjson can't encode natively falls back to str() via default=
+_PAYLOAD_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+
+# Frames with no per-request fields, encoded once at import
+_FRAME_START_STEP = b'data: {"type":"start-step"}\n\n'
+_FRAME_FINISH_STEP = b'data: {"type":"finish-step"}\n\n'
+_FRAME_DONE = b"data: [DONE]\n\n"
+_FINISH_FRAMES = {
+    reason: b"data: " + _dumps({"type": "finish", "finishReason": reason}) + b"\n\n"
+    for reason in ("stop", "error")
+}
+
 
 class StreamAdapter:
     """Converts LangGraph events to AI SDK v5 UI Message Stream Protocol"""
 
+    # One adapter per streamed response - no per-instance __dict__
+    __slots__ = (
+        "message_id", "text_id", "_text_seq", "_delta_prefix", "current_step",
+        "active_tool_calls", "_calls_by_name", "_tool_fields",
+    )
+
     def __init__(self):
-        self.message_id = f"msg_{uuid.uuid4().hex}"
+        self.message_id = "msg_" + secrets.token_hex(16)
         self.text_id: Optional[str] = None
+        self._text_seq = 0  # Text block counter (IDs only need to be unique per message)
+        self._delta_prefix = b""  # Constant part of text-delta frames, set in text_start
         self.current_step = 0
         self.active_tool_calls: dict[str, str] = {}  # tool_call_id -> tool_name
+        # tool_name -> open tool_call_ids, oldest first (for end events without an ID)
+        self._calls_by_name: defaultdict[str, deque[str]] = defaultdict(deque)
+        # tool_call_id -> encoded '"toolCallId":...,"toolName":...' shared by its frames
+        self._tool_fields: dict[str, bytes] = {}
+
+    def _sse(self, data: dict) -> bytes:
+        """Format data as SSE event.
 
-    def _sse(self, data: Any) -> str:
-        """Format data as SSE event"""
-        if isinstance(data, str):
-            return f"data: {data}\n\n"
-        return f"data: {json.dumps(data)}\n\n"
+        Payloads are always JSON-encoded, which escapes any CR/LF in the
+        content - raw text must never be written after "data:" directly,
+        or a stray newline would split the event on the client.
+        """
+        return b"data: " + _dumps(data, default=str, option=_PAYLOAD_OPTIONS) + b"\n\n"
 
-    def start_message(self) -> str:
+    def start_message(self) -> bytes:
         """Start a new assistant message - REQUIRED for AI SDK to create message parts"""
         return self._sse({
             "type": "start",
             "messageId": self.message_id
         })
 
-    def start_step(self) -> str:
+    def start_step(self) -> bytes:
         """Start a new step"""
         self.current_step += 1
-        return self._sse({"type": "start-step"})
+        return _FRAME_START_STEP
 
-    def finish_step(self) -> str:
+    def finish_step(self) -> bytes:
         """Finish current step"""
-        result = ""
+        result = bytearray()
         # End any open text blocks
         if self.text_id:
             result += self.text_end()
-        result += self._sse({"type": "finish-step"})
-        return result
+        result += _FRAME_FINISH_STEP
+        return bytes(result)
 
-    def text_start(self) -> str:
+    def text_start(self) -> bytes:
         """Start a text block"""
-        self.text_id = f"text_{uuid.uuid4().hex[:12]}"
+        self._text_seq += 1
+        self.text_id = f"{self.message_id}_t{self._text_seq}"
+        # type/id are fixed for the whole block - serialize them once
+        self._delta_prefix = b'data: {"type":"text-delta","id":' + _dumps(self.text_id) + b',"delta":'
         return self._sse({
             "type": "text-start",
             "id": self.text_id
         })
 
-    def text_delta(self, content: str) -> str:
+    def text_delta(self, content: str) -> bytes:
         """Stream a text chunk"""
-        result = ""
+        if self.text_id:
+            return self._delta_prefix + _dumps(content) + _DELTA_SUFFIX
         # Auto-start text block if not started
-        if not self.text_id:
-            result += self.text_start()
-        result += self._sse({
-            "type": "text-delta",
-            "id": self.text_id,
-            "delta": content
-        })
-        return result
+        result = bytearray(self.text_start())
+        result += self._delta_prefix
+        result += _dumps(content)
+        result += _DELTA_SUFFIX
+        return bytes(result)
 
-    def text_end(self) -> str:
+    def text_end(self) -> bytes:
         """End a text block"""
         if not self.text_id:
-            return ""
+            return b""
         result = self._sse({
             "type": "text-end",
             "id": self.text_id
@@ -90,120 +127,92 @@ class StreamAdapter:
         self.text_id = None
         return result
 
-    def tool_start(self, tool_call_id: str, tool_name: str) -> str:
+    @staticmethod
+    def _encode_tool_fields(tool_call_id: str, tool_name: str) -> bytes:
+        """Encode the toolCallId/toolName members shared by a call's frames"""
+        return b'"toolCallId":' + _dumps(tool_call_id) + b',"toolName":' + _dumps(tool_name)
+
+    def tool_start(self, tool_call_id: str, tool_name: str) -> bytes:
         """Start a tool call"""
         self.active_tool_calls[tool_call_id] = tool_name
-        return self._sse({
-            "type": "tool-input-start",
-            "toolCallId": tool_call_id,
-            "toolName": tool_name
-        })
+        self._calls_by_name[tool_name].append(tool_call_id)
+        # ID and name are fixed for the whole call - escape them once
+        fields = self._encode_tool_fields(tool_call_id, tool_name)
+        self._tool_fields[tool_call_id] = fields
+        return b'data: {"type":"tool-input-start",' + fields + b"}\n\n"
 
-    def tool_input_available(self, tool_call_id: str, tool_name: str, args: dict) -> str:
+    def tool_input_available(self, tool_call_id: str, tool_name: str, args: dict) -> bytes:
         """Signal tool input is available"""
-        return self._sse({
-            "type": "tool-input-available",
-            "toolCallId": tool_call_id,
-            "toolName": tool_name,
-            "input": args
-        })
+        fields = self._tool_fields.get(tool_call_id) or self._encode_tool_fields(tool_call_id, tool_name)
+        return (
+            b'data: {"type":"tool-input-available",' + fields
+            + b',"input":' + _dumps(args, default=str, option=_PAYLOAD_OPTIONS) + b"}\n\n"
+        )
 
-    def tool_output_available(self, tool_call_id: str, output: Any) -> str:
+    def tool_output_available(self, tool_call_id: str, output: Any) -> bytes:
         """Signal tool output is available"""
-        if isinstance(output, (dict, list)):
-            output_data = output
-        else:
-            output_data = str(output) if output else "completed"
+        if output is None or (isinstance(output, str) and not output):
+            output = "completed"
 
-        return self._sse({
-            "type": "tool-output-available",
-            "toolCallId": tool_call_id,
-            "output": output_data
-        })
+        return (
+            b'data: {"type":"tool-output-available","toolCallId":' + _dumps(tool_call_id)
+            + b',"output":' + _dumps(output, default=str, option=_PAYLOAD_OPTIONS) + b"}\n\n"
+        )
 
     def tool_status(self, tool_name: str, status: str = "start", args: Optional[dict] = None,
-                    tool_call_id: Optional[str] = None, result: Optional[Any] = None) -> str:
+                    tool_call_id: Optional[str] = None, result: Optional[Any] = None) -> bytes:
         """Stream tool status using AI SDK protocol"""
         if status == "start":
             # Generate tool call ID if not provided
             if not tool_call_id:
-                tool_call_id = f"call_{uuid.uuid4().hex[:12]}"
-
-            # Store for later lookup
-            self.active_tool_calls[tool_call_id] = tool_name
+                tool_call_id = "call_" + secrets.token_hex(6)
 
-            # Emit tool-input-start followed by tool-input-available
-            output = self.tool_start(tool_call_id, tool_name)
+            # Emit tool-input-start followed by tool-input-available (the AI SDK
+            # needs both parts), written back-to-back into one buffer
+            output = bytearray(self.tool_start(tool_call_id, tool_name))
             output += self.tool_input_available(tool_call_id, tool_name, args or {})
-            return output
+            return bytes(output)
         else:  # end
             # Find the tool call ID
             actual_id = tool_call_id
-            if not actual_id:
-                # Try to find by tool name
-                for tid, tname in list(self.active_tool_calls.items()):
-                    if tname == tool_name:
-                        actual_id = tid
-                        break
-
-            output = ""
+            if actual_id:
+                name = self.active_tool_calls.get(actual_id)
+                if name is not None:
+                    self._calls_by_name[name].remove(actual_id)
+            else:
+                # Fall back to the oldest open call with this tool name
+                pending = self._calls_by_name.get(tool_name)
+                if pending:
+                    actual_id = pending.popleft()
+
+            output = b""
             if actual_id:
                 # Emit tool-output-available
                 output = self.tool_output_available(actual_id, result)
                 # Remove from active calls
                 self.active_tool_calls.pop(actual_id, None)
+                self._tool_fields.pop(actual_id, None)
 
             return output
 
-    def error(self, message: str) -> str:
+    def error(self, message: str) -> bytes:
         """Stream an error"""
         return self._sse({
             "type": "error",
             "errorText": message
         })
 
-    def finish(self, reason: str = "stop", usage: Optional[dict] = None) -> str:
+    def finish(self, reason: str = "stop", usage: Optional[dict] = None) -> bytes:
         """Stream finish signal and close stream"""
-        result = ""
+        result = bytearray()
         # End any open text block
         if self.text_id:
             result += self.text_end()
 
         # Send finish event (AI SDK doesn't accept usage in finish event)
-        result += self._sse({"type": "finish", "finishReason": reason})
+        finish_frame = _FINISH_FRAMES.get(reason)
+        result += finish_frame or self._sse({"type": "finish", "finishReason": reason})
 
         # Send DONE marker to signal end of stream
-        result += "data: [DONE]\n\n"
-        return result
-
-
-# Legacy adapter for backwards compatibility (old protocol format)
-class LegacyStreamAdapter:
-    """Old AI SDK Data Stream Protocol v1 format (0:, d:, etc.)"""
-
-    @staticmethod
-    def text(chunk: str) -> str:
-        return f'0:{json.dumps(chunk)}\n'
-
-    @staticmethod
-    def data(payload: list) -> str:
-        return f'2:{json.dumps(payload)}\n'
-
-    @staticmethod
-    def tool_call(tool_call_id: str, tool_name: str, args: dict) -> str:
-        return f'9:{json.dumps({"toolCallId": tool_call_id, "toolName": tool_name, "args": args})}\n'
-
-    @staticmethod
-    def tool_result(tool_call_id: str, result: Any) -> str:
-        return f'a:{json.dumps({"toolCallId": tool_call_id, "result": result})}\n'
-
-    @staticmethod
-    def error(message: str) -> str:
-        return f'3:{json.dumps(message)}\n'
-
-    @staticmethod
-    def finish(reason: str = "stop", usage: Optional[dict] = None) -> str:
-        payload = {"finishReason": reason}
-        if usage:
-            payload["usage"] = usage
-        return f'd:{json.dumps(payload)}\n'
+        result += _FRAME_DONE
+        return bytes(result)
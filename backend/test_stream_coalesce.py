@@ -0,0 +1,73 @@
+"""
+Tests for coalesce_stream (SSE frame batching in server.py).
+
+Usage:
+    python -m pytest backend/test_stream_coalesce.py -q
+"""
+
+import asyncio
+import time
+
+import pytest
+
+server = pytest.importorskip("server")
+coalesce_stream = server.coalesce_stream
+
+
+async def _collect(frames, **kwargs):
+    """Drain coalesce_stream, recording (elapsed_seconds, chunk) per write."""
+    start = time.perf_counter()
+    writes = []
+    async for chunk in coalesce_stream(frames, **kwargs):
+        writes.append((time.perf_counter() - start, chunk))
+    return writes
+
+
+def test_continuous_producer_is_flushed_while_streaming():
+    # Frames arrive every ~0.5 ms - always inside the 2 ms gap window
+    count = 400
+
+    async def producer():
+        for i in range(count):
+            yield f"data: {i}\n\n"
+            await asyncio.sleep(0.0005)
+
+    writes = asyncio.run(_collect(producer(), window=0.002, max_delay=0.015, max_bytes=1 << 20))
+
+    assert len(writes) > 5
+    # First write goes out long before the producer finishes
+    assert writes[0][0] < 0.1
+    assert b"".join(chunk for _, chunk in writes) == "".join(
+        f"data: {i}\n\n" for i in range(count)
+    ).encode()
+
+
+def test_byte_cap_splits_bursts():
+    frame = b"x" * 500
+
+    async def burst():
+        for _ in range(20):
+            yield frame
+
+    writes = asyncio.run(_collect(burst(), window=1.0, max_delay=1.0, max_bytes=1400))
+
+    assert len(writes) > 1
+    assert all(len(chunk) < 1400 + len(frame) for _, chunk in writes)
+    assert sum(len(chunk) for _, chunk in writes) == 20 * len(frame)
+
+
+def test_buffered_frames_flushed_before_source_error():
+    async def failing():
+        yield b"a"
+        yield "b"
+        raise RuntimeError("boom")
+
+    received = []
+
+    async def run():
+        async for chunk in coalesce_stream(failing(), window=1.0, max_delay=1.0):
+            received.append(chunk)
+
+    with pytest.raises(RuntimeError, match="boom"):
+        asyncio.run(run())
+    assert b"".join(received) == b"ab"
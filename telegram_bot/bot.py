@@ -25,6 +25,13 @@ from pathlib import Path
 # The default ProactorEventLoop on Windows has issues with python-telegram-bot
 if sys.platform == 'win32':
     asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+else:
+    # Faster event loop for the polling/streaming loop when available (optional)
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
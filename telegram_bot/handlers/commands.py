@@ -1,5 +1,6 @@
 """Command handlers for Telegram bot."""
 
+import asyncio
 import logging
 import subprocess
 import sys
@@ -23,6 +24,23 @@ logger = logging.getLogger(__name__)
 PROJECT_ROOT = Path(__file__).parent.parent.parent
 
 
+async def _run_git(*args: str, timeout: float) -> subprocess.CompletedProcess:
+    """
+    Run a git command in the project root without blocking the event loop.
+
+    subprocess.run goes to a worker thread: the bot uses the selector event
+    loop on Windows, which has no asyncio subprocess support.
+    """
+    return await asyncio.to_thread(
+        subprocess.run,
+        ["git", *args],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        timeout=timeout
+    )
+
+
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle /start command."""
     user = update.effective_user
@@ -171,13 +189,7 @@ async def update_command(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
 
     try:
         # Fetch latest from origin
-        fetch_result = subprocess.run(
-            ["git", "fetch", "origin"],
-            cwd=PROJECT_ROOT,
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
+        fetch_result = await _run_git("fetch", "origin", timeout=30)
 
         if fetch_result.returncode != 0:
             # Send error without markdown to avoid parsing issues
@@ -188,33 +200,15 @@ async def update_command(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
             return
 
         # Check if we're behind origin
-        status_result = subprocess.run(
-            ["git", "status", "-uno"],
-            cwd=PROJECT_ROOT,
-            capture_output=True,
-            text=True,
-            timeout=10
-        )
+        status_result = await _run_git("status", "-uno", timeout=10)
 
         if "Your branch is behind" in status_result.stdout:
             # Get current branch name
-            branch_result = subprocess.run(
-                ["git", "rev-parse", "--abbrev-ref", "HEAD"],
-                cwd=PROJECT_ROOT,
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
+            branch_result = await _run_git("rev-parse", "--abbrev-ref", "HEAD", timeout=10)
             current_branch = branch_result.stdout.strip() or "main"
 
             # Get commit count using current branch
-            count_result = subprocess.run(
-                ["git", "rev-list", "--count", f"HEAD..origin/{current_branch}"],
-                cwd=PROJECT_ROOT,
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
+            count_result = await _run_git("rev-list", "--count", f"HEAD..origin/{current_branch}", timeout=10)
             commit_count = count_result.stdout.strip() or "?"
 
             await update.message.reply_text(
@@ -223,13 +217,7 @@ async def update_command(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
             )
 
             # Pull updates
-            pull_result = subprocess.run(
-                ["git", "pull", "origin"],
-                cwd=PROJECT_ROOT,
-                capture_output=True,
-                text=True,
-                timeout=60
-            )
+            pull_result = await _run_git("pull", "origin", timeout=60)
 
             if pull_result.returncode != 0:
                 # Send error without markdown to avoid parsing issues
@@ -240,13 +228,7 @@ async def update_command(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
                 return
 
             # Get last commit info
-            log_result = subprocess.run(
-                ["git", "log", "-1", "--format=%s"],
-                cwd=PROJECT_ROOT,
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
+            log_result = await _run_git("log", "-1", "--format=%s", timeout=10)
             last_commit = log_result.stdout.strip()
             # Escape special markdown characters in commit message
             last_commit_escaped = last_commit.replace('_', '\\_').replace('*', '\\*').replace('`', '\\`').replace('[', '\\[')
@@ -9,31 +9,33 @@ from pathlib import Path
 logger = logging.getLogger(__name__)
 
 
+# tasklist exists only on Windows - pick the process check once instead of
+# spawning a failing tasklist before pgrep on every call elsewhere
+_IS_WINDOWS = os.name == "nt"
+
+
 def is_cloudflared_running() -> bool:
     """Check if cloudflared process is currently running."""
     try:
-        # Use tasklist on Windows to check for cloudflared.exe
-        result = subprocess.run(
-            ["tasklist", "/FI", "IMAGENAME eq cloudflared.exe", "/NH"],
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-        # If cloudflared is running, output will contain "cloudflared.exe"
-        is_running = "cloudflared.exe" in result.stdout.lower()
-        logger.debug(f"cloudflared running: {is_running}")
-        return is_running
-    except FileNotFoundError:
-        # Not on Windows, try pgrep
-        try:
+        if _IS_WINDOWS:
+            # Use tasklist on Windows to check for cloudflared.exe
             result = subprocess.run(
-                ["pgrep", "-x", "cloudflared"],
+                ["tasklist", "/FI", "IMAGENAME eq cloudflared.exe", "/NH"],
                 capture_output=True,
+                text=True,
                 timeout=5
             )
-            return result.returncode == 0
-        except Exception as e:
-            logger.debug(f"pgrep check failed: {e}")
+            # If cloudflared is running, output will contain "cloudflared.exe"
+            is_running = "cloudflared.exe" in result.stdout.lower()
+            logger.debug(f"cloudflared running: {is_running}")
+            return is_running
+
+        result = subprocess.run(
+            ["pgrep", "-x", "cloudflared"],
+            capture_output=True,
+            timeout=5
+        )
+        return result.returncode == 0
     except Exception as e:
         logger.debug(f"Process check failed: {e}")
     return False